@@ -0,0 +1,468 @@
+# Python imports
+import collections
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Site-Package imports
+from dataclasses import dataclass
+from sqlalchemy import Boolean, create_engine, Column, event, ForeignKey, func, inspect, Integer, MetaData, Table, Text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.url import URL
+from sqlalchemy.pool import SingletonThreadPool
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql import select, text
+from sqlalchemy.sql.expression import bindparam
+
+
+Records = Dict[Tuple[str, Any], Dict[str, Any]]
+
+
+class PlayerDataRow(NamedTuple):
+    """One row of a player's joined settings, hero, and skill data."""
+    active_hero_id: Optional[int]
+    inspect_to_ult: bool
+    upgrade_skills_popup: int
+    hero_id: Optional[int]
+    hero_key: Optional[str]
+    hero_level: Optional[int]
+    hero_xp: Optional[int]
+    skill_id: Optional[int]
+    skill_key: Optional[str]
+    skill_level: Optional[int]
+
+
+class LeaderboardRow(NamedTuple):
+    """One player's entry on the leaderboard."""
+    steamid: str
+    name: Optional[str]
+    total_level: int
+
+
+class Backend(ABC):
+    """Interface for storing Hero-Wars data.
+
+    Backends only deal with plain rows and records,
+    converting them from and to game objects is up to the caller.
+    All methods must be safe to call from any thread.
+    """
+
+    @abstractmethod
+    def transaction(self) -> ContextManager:
+        """Share one transaction between backend calls made inside the block."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_player(self, steamid: str) -> List[PlayerDataRow]:
+        """Fetch all of a player's data rows, or an empty list for a new player."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_player(self, steamid: str, values: Dict[str, Any]):
+        """Insert a new player with their settings and leaderboard columns."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_hero(self, steamid: str, values: Dict[str, Any], skills: List[Dict[str, Any]]) -> Tuple[int, List[int]]:
+        """Insert a hero with its skills.
+
+        Returns the hero's ID and the skills' IDs in the same order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_skills(self, hero_id: int, skills: List[Dict[str, Any]]) -> List[int]:
+        """Insert skills for an existing hero.
+
+        Returns the skills' IDs in the same order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def write(self, records: Records):
+        """Update existing rows with the changed columns in records."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_leaderboard(self, offset: int, limit: int) -> List[LeaderboardRow]:
+        """Fetch players ordered by their total level, highest first."""
+        raise NotImplementedError
+
+
+# SQLAlchemy backends
+
+_metadata = MetaData()
+
+
+@dataclass
+class _Tables:
+    player: Table
+    hero: Table
+    skill: Table
+    schema_version: Table
+
+
+_t = _Tables(
+    player=Table('player', _metadata,
+        Column('steamid', Text, primary_key=True),
+        Column('hero_id', Integer, ForeignKey('hero.id')),
+        # Player Settings
+        Column('inspect_to_ult', Boolean, nullable=False, default=True),
+        Column('upgrade_skills_popup', Integer, nullable=False, default=1),
+        # Leaderboard
+        Column('name', Text),
+        Column('total_level', Integer, nullable=False, default=0, server_default='0', index=True),
+    ),
+    hero=Table('hero', _metadata,
+        Column('id', Integer, primary_key=True),
+        Column('key', Text, nullable=False),
+        Column('level', Integer),
+        Column('xp', Integer),
+        Column('steamid', Integer, ForeignKey('player.steamid'), nullable=False, index=True),
+    ),
+    skill=Table('skill', _metadata,
+        Column('id', Integer, primary_key=True),
+        Column('key', Text, nullable=False),
+        Column('level', Integer),
+        Column('hero_id', Integer, ForeignKey('hero.id'), nullable=False, index=True),
+    ),
+    schema_version=Table('schema_version', _metadata,
+        Column('version', Integer, nullable=False),
+    ),
+)
+
+
+# Schema migrations
+
+_migrations: List[Tuple[int, Callable[[Connection], None]]] = []
+
+
+def _migration(version: int) -> Callable:
+    """Register a function for migrating the schema to a version.
+
+    Migrations bring existing databases up to date with the tables
+    defined above. New databases are created directly at the latest version.
+    """
+    def decorator(func: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        _migrations.append((version, func))
+        _migrations.sort(key=lambda migration: migration[0])
+        return func
+    return decorator
+
+
+def _add_index(conn: Connection, table: Table, column_name: str):
+    """Create a column's index, unless it already exists."""
+    existing = {index['name'] for index in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing and column_name in index.columns:
+            index.create(bind=conn)
+
+
+def _add_column(conn: Connection, table: Table, column_name: str):
+    """Add a column to an existing table, unless it already exists."""
+    existing = {column['name'] for column in inspect(conn).get_columns(table.name)}
+    if column_name not in existing:
+        column_ddl = CreateColumn(table.c[column_name]).compile(dialect=conn.dialect)
+        conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_ddl}'))
+
+
+@_migration(1)
+def _index_foreign_keys(conn: Connection):
+    _add_index(conn, _t.hero, 'steamid')
+    _add_index(conn, _t.skill, 'hero_id')
+
+
+@_migration(2)
+def _add_leaderboard(conn: Connection):
+    _add_column(conn, _t.player, 'name')
+    _add_column(conn, _t.player, 'total_level')
+    _add_index(conn, _t.player, 'total_level')
+    conn.execute(
+        _t.player.update().values(
+            total_level=select([func.coalesce(func.sum(_t.hero.c.level), 0)])\
+                .where(_t.hero.c.steamid==_t.player.c.steamid)\
+                .as_scalar()
+        )
+    )
+
+
+class SQLAlchemyBackend(Backend):
+    """Backend for any database supported by SQLAlchemy."""
+
+    def __init__(self, url: URL):
+        self.engine = self._create_engine(url)
+        self._local = threading.local()
+        self._update_statements = {}
+        self._migrate()
+
+    def _create_engine(self, url: URL) -> Engine:
+        return create_engine(url)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Connection]:
+        """Share one connection and transaction between backend calls.
+
+        Calls made inside the block reuse the outermost transaction,
+        so a whole logical operation commits once on one connection.
+        Transactions are tracked per thread.
+        """
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            yield conn
+            return
+        with self.engine.begin() as conn:
+            self._local.connection = conn
+            try:
+                yield conn
+            finally:
+                self._local.connection = None
+
+    def _migrate(self):
+        """Create missing tables and run pending schema migrations."""
+        is_new = 'player' not in inspect(self.engine).get_table_names()
+        _metadata.create_all(bind=self.engine)
+        with self.transaction() as conn:
+            row = conn.execute(select([_t.schema_version.c.version])).first()
+            if row is None:
+                version = _migrations[-1][0] if is_new else 0
+                conn.execute(_t.schema_version.insert().values(version=version))
+            else:
+                version = row.version
+
+            for migration_version, migrate in _migrations:
+                if migration_version > version:
+                    migrate(conn)
+                    conn.execute(_t.schema_version.update().values(version=migration_version))
+
+    # Statements are built once and reused, allowing the compiled
+    # statements to be cached by the engine and the database driver
+
+    _fetch_player_statement = select([
+            _t.player.c.hero_id.label('active_hero_id'),
+            _t.player.c.inspect_to_ult,
+            _t.player.c.upgrade_skills_popup,
+            _t.hero.c.id.label('hero_id'),
+            _t.hero.c.key.label('hero_key'),
+            _t.hero.c.level.label('hero_level'),
+            _t.hero.c.xp.label('hero_xp'),
+            _t.skill.c.id.label('skill_id'),
+            _t.skill.c.key.label('skill_key'),
+            _t.skill.c.level.label('skill_level'),
+        ])\
+        .select_from(
+            _t.player\
+                .outerjoin(_t.hero, _t.hero.c.steamid==_t.player.c.steamid)\
+                .outerjoin(_t.skill, _t.skill.c.hero_id==_t.hero.c.id)
+        )\
+        .where(_t.player.c.steamid==bindparam('b_steamid'))
+
+    _fetch_leaderboard_statement = select([
+            _t.player.c.steamid,
+            _t.player.c.name,
+            _t.player.c.total_level,
+        ])\
+        .order_by(_t.player.c.total_level.desc())\
+        .offset(bindparam('b_offset'))\
+        .limit(bindparam('b_limit'))
+
+    def _update_statement(self, table_name: str, columns: Tuple[str, ...]):
+        """Get a reusable UPDATE statement for a table's columns."""
+        key = (table_name, columns)
+        if key not in self._update_statements:
+            table = getattr(_t, table_name)
+            id_column = table.c.steamid if table_name == 'player' else table.c.id
+            self._update_statements[key] = table.update()\
+                .where(id_column==bindparam('b_id'))\
+                .values({column: bindparam(column) for column in columns})
+        return self._update_statements[key]
+
+    def fetch_player(self, steamid: str) -> List[PlayerDataRow]:
+        with self.transaction() as conn:
+            result = conn.execute(self._fetch_player_statement, b_steamid=steamid)
+            return [PlayerDataRow(*row) for row in result]
+
+    def insert_player(self, steamid: str, values: Dict[str, Any]):
+        with self.transaction() as conn:
+            conn.execute(_t.player.insert().values(steamid=steamid, **values))
+
+    def insert_hero(self, steamid: str, values: Dict[str, Any], skills: List[Dict[str, Any]]) -> Tuple[int, List[int]]:
+        with self.transaction() as conn:
+            result = conn.execute(_t.hero.insert().values(steamid=steamid, **values))
+            hero_id = result.inserted_primary_key[0]
+            return hero_id, self.insert_skills(hero_id, skills)
+
+    def insert_skills(self, hero_id: int, skills: List[Dict[str, Any]]) -> List[int]:
+        if not skills:
+            return []
+        with self.transaction() as conn:
+            result = conn.execute(
+                _t.skill.insert().values([
+                    {**skill, 'hero_id': hero_id}
+                    for skill in skills
+                ])
+            )
+            last_id = result.inserted_primary_key[0]
+            first_id = last_id - len(skills) + 1
+            return list(range(first_id, last_id + 1))
+
+    def write(self, records: Records):
+        """Write records in a single transaction.
+
+        Rows of the same table with the same changed columns are
+        grouped together and updated with one executemany statement.
+        """
+        groups = collections.defaultdict(list)
+        for (table_name, id_), values in records.items():
+            groups[table_name, tuple(sorted(values))].append({'b_id': id_, **values})
+
+        with self.transaction() as conn:
+            for (table_name, columns), params in groups.items():
+                conn.execute(self._update_statement(table_name, columns), params)
+
+    def fetch_leaderboard(self, offset: int, limit: int) -> List[LeaderboardRow]:
+        with self.transaction() as conn:
+            result = conn.execute(self._fetch_leaderboard_statement, b_offset=offset, b_limit=limit)
+            return [LeaderboardRow(*row) for row in result]
+
+
+class SQLiteBackend(SQLAlchemyBackend):
+    """SQLAlchemy backend tuned for a local SQLite database.
+
+    Uses write-ahead logging so commits don't block readers
+    and don't require a full fsync of the database file,
+    and keeps one connection per thread to reuse prepared statements.
+    """
+
+    def __init__(self, url: URL, synchronous: str='NORMAL', cached_statements: int=128):
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        super().__init__(url)
+
+    def _create_engine(self, url: URL) -> Engine:
+        engine = create_engine(
+            url,
+            poolclass=SingletonThreadPool,
+            connect_args={
+                'check_same_thread': False,
+                'cached_statements': self.cached_statements,
+            },
+        )
+
+        @event.listens_for(engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute(f'PRAGMA synchronous={self.synchronous}')
+            cursor.close()
+
+        # Reuse compiled statements instead of compiling them on every call
+        return engine.execution_options(compiled_cache={})
+
+
+# In-memory backend
+
+class MemoryBackend(Backend):
+    """Non-persistent backend storing everything in dictionaries.
+
+    Data is lost when the plugin is unloaded.
+    Intended for testing and benchmarking.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tables: Dict[str, Dict[Any, Dict[str, Any]]] = {
+            'player': {},
+            'hero': {},
+            'skill': {},
+        }
+        self._ids = itertools.count(1)
+
+    def transaction(self) -> ContextManager:
+        return self._lock
+
+    def fetch_player(self, steamid: str) -> List[PlayerDataRow]:
+        with self._lock:
+            player = self._tables['player'].get(steamid)
+            if player is None:
+                return []
+            rows = []
+            for hero_id, hero in self._tables['hero'].items():
+                if hero['steamid'] != steamid:
+                    continue
+                skills = [
+                    (skill_id, skill)
+                    for skill_id, skill in self._tables['skill'].items()
+                    if skill['hero_id'] == hero_id
+                ] or [(None, {'key': None, 'level': None})]
+                for skill_id, skill in skills:
+                    rows.append(PlayerDataRow(
+                        player['hero_id'], player['inspect_to_ult'], player['upgrade_skills_popup'],
+                        hero_id, hero['key'], hero['level'], hero['xp'],
+                        skill_id, skill['key'], skill['level'],
+                    ))
+            if not rows:
+                rows.append(PlayerDataRow(
+                    player['hero_id'], player['inspect_to_ult'], player['upgrade_skills_popup'],
+                    None, None, None, None, None, None, None,
+                ))
+            return rows
+
+    def insert_player(self, steamid: str, values: Dict[str, Any]):
+        with self._lock:
+            self._tables['player'][steamid] = {
+                'hero_id': None,
+                'inspect_to_ult': True,
+                'upgrade_skills_popup': 1,
+                'name': None,
+                'total_level': 0,
+                **values,
+            }
+
+    def insert_hero(self, steamid: str, values: Dict[str, Any], skills: List[Dict[str, Any]]) -> Tuple[int, List[int]]:
+        with self._lock:
+            hero_id = next(self._ids)
+            self._tables['hero'][hero_id] = {'steamid': steamid, **values}
+            return hero_id, self.insert_skills(hero_id, skills)
+
+    def insert_skills(self, hero_id: int, skills: List[Dict[str, Any]]) -> List[int]:
+        with self._lock:
+            skill_ids = []
+            for skill in skills:
+                skill_id = next(self._ids)
+                self._tables['skill'][skill_id] = {'hero_id': hero_id, **skill}
+                skill_ids.append(skill_id)
+            return skill_ids
+
+    def write(self, records: Records):
+        with self._lock:
+            for (table_name, id_), values in records.items():
+                row = self._tables[table_name].get(id_)
+                if row is not None:
+                    row.update(values)
+
+    def fetch_leaderboard(self, offset: int, limit: int) -> List[LeaderboardRow]:
+        with self._lock:
+            players = sorted(
+                self._tables['player'].items(),
+                key=lambda item: item[1]['total_level'],
+                reverse=True,
+            )
+            return [
+                LeaderboardRow(steamid, player['name'], player['total_level'])
+                for steamid, player in players[offset:offset + limit]
+            ]
+
+
+def create_backend(url: Dict[str, Optional[str]], sqlite_synchronous: str='NORMAL') -> Backend:
+    """Create a backend for a database URL's components.
+
+    A drivername of 'memory' creates a non-persistent in-memory backend.
+    """
+    drivername = url['drivername']
+    if drivername == 'memory':
+        return MemoryBackend()
+    if drivername.split('+')[0] == 'sqlite':
+        return SQLiteBackend(URL(**url), synchronous=sqlite_synchronous)
+    return SQLAlchemyBackend(URL(**url))
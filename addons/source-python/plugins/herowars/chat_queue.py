@@ -0,0 +1,116 @@
+# Python imports
+import time
+from typing import Any, Dict, List, Optional
+
+# Source.Python imports
+from listeners import OnLevelEnd, OnTick
+from messages import SayText2
+from messages.colors.saytext2 import GREEN, WHITE
+from translations.strings import TranslationStrings
+
+# Hero-Wars imports
+from . import config
+from .utils import create_translation_string
+
+
+class _QueuedMessage:
+    """Chat message waiting to be sent, along with its repeat count."""
+
+    def __init__(self, message: TranslationStrings, prefix: Optional[TranslationStrings], tokens: Dict[str, Any]):
+        self.message = message
+        self.prefix = prefix
+        self.tokens = tokens
+        self.count = 1
+
+    def matches(self, message: TranslationStrings, prefix: Optional[TranslationStrings], tokens: Dict[str, Any]) -> bool:
+        """Check if another message would render exactly the same."""
+        if message is not self.message or prefix is not self.prefix or tokens.keys() != self.tokens.keys():
+            return False
+        for key, value in tokens.items():
+            other = self.tokens[key]
+            if isinstance(value, TranslationStrings) or isinstance(other, TranslationStrings):
+                if value is not other:
+                    return False
+            elif value != other:
+                return False
+        return True
+
+    def render(self) -> TranslationStrings:
+        line = self.message.tokenized(**self.tokens)
+        if self.prefix is not None:
+            line = create_translation_string(
+                f'[{GREEN}{{name}}{WHITE}] {{message}}',
+                name=self.prefix,
+                message=line,
+            )
+        if self.count > 1:
+            line = create_translation_string('{line} (x{count})', line=line, count=self.count)
+        return line
+
+
+class ChatQueue:
+    """Per-player queue of outgoing chat messages.
+
+    Messages queued during a tick are sent together when the queue
+    is flushed, combining multiple lines into a single SayText2,
+    and merging duplicate messages into one line with a repeat count.
+    """
+
+    def __init__(self, max_lines: int=4):
+        self.max_lines = max_lines
+        self._queues: Dict[int, List[_QueuedMessage]] = {}
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    def put(self, index: int, message: TranslationStrings, prefix: Optional[TranslationStrings]=None, **tokens: Dict[str, Any]):
+        """Queue a message to a player, optionally prefixed with a name."""
+        queue = self._queues.setdefault(index, [])
+        for queued in queue:
+            if queued.matches(message, prefix, tokens):
+                queued.count += 1
+                return
+        queue.append(_QueuedMessage(message, prefix, tokens))
+
+    def discard(self, index: int):
+        """Drop all messages queued for a player."""
+        self._queues.pop(index, None)
+
+    def clear(self):
+        self._queues.clear()
+
+    def flush(self):
+        """Send all the queued messages."""
+        queues, self._queues = self._queues, {}
+        for index, queue in queues.items():
+            for start in range(0, len(queue), self.max_lines):
+                lines = [queued.render() for queued in queue[start:start + self.max_lines]]
+                if len(lines) == 1:
+                    message = lines[0]
+                else:
+                    message = create_translation_string(
+                        '\n'.join(f'{{line{i}}}' for i in range(len(lines))),
+                        **{f'line{i}': line for i, line in enumerate(lines)},
+                    )
+                SayText2(message).send(index)
+
+
+chat_queue = ChatQueue(max_lines=config.chat_max_lines.get_int())
+_next_flush = 0.0
+
+
+@OnTick
+def _on_tick():
+    global _next_flush
+    if not chat_queue:
+        return
+    now = time.time()
+    if now < _next_flush:
+        return
+    _next_flush = now + config.chat_flush_interval.get_float()
+    chat_queue.flush()
+
+
+@OnLevelEnd
+def _on_level_end():
+    chat_queue.clear()
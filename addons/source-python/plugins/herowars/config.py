@@ -9,10 +9,22 @@ with ConfigManager('herowars/main', cvar_prefix='hw_', indention=0) as main_conf
     starting_hero = main_config.cvar('starting_hero', '', 'Default starting hero given to new players')
     starting_hero.Description.append('Leave empty to give the first available hero')
 
+    chat_flush_interval = main_config.cvar('chat_flush_interval', 0, 'Seconds between sending queued chat messages, 0 to send every tick')
+    chat_max_lines = main_config.cvar('chat_max_lines', 4, 'Maximum number of queued chat messages combined into one')
+
+    leaderboard_size = main_config.cvar('leaderboard_size', 50, 'Number of players listed in the !top menu')
+    leaderboard_ttl = main_config.cvar('leaderboard_ttl', 30.0, 'Seconds the !top menu is cached before refreshing it in the background')
+
+    profile_cache_size = main_config.cvar('profile_cache_size', 64, 'Number of recently disconnected players kept in memory')
+    profile_cache_memory = main_config.cvar('profile_cache_memory', 4096, 'Maximum memory used by the cached players, in kilobytes')
+
+    hot_reload = main_config.cvar('hot_reload', 0, 'Reload heroes whose files change while the server is running')
+    hot_reload_interval = main_config.cvar('hot_reload_interval', 1.0, 'Seconds between checking the hero files for changes')
+
 
 with ConfigManager('herowars/database', cvar_prefix='hw_db_', indention=0) as db_config:
     db_url = {
-        'drivername': db_config.cvar('url_drivername', 'sqlite', 'SQLAlchemy drivername'),
+        'drivername': db_config.cvar('url_drivername', 'sqlite', 'SQLAlchemy drivername, or "memory" for a non-persistent in-memory database'),
         'username': db_config.cvar('url_username', '', 'SQLAlchemy username'),
         'password': db_config.cvar('url_password', '', 'SQLAlchemy password'),
         'host': db_config.cvar('url_host', '', 'SQLAlchemy host'),
@@ -21,6 +33,11 @@ with ConfigManager('herowars/database', cvar_prefix='hw_db_', indention=0) as db
         'query': db_config.cvar('url_query', '', 'SQLAlchemy query'),
     }
 
+    db_sqlite_synchronous = db_config.cvar('sqlite_synchronous', 'NORMAL', 'SQLite synchronous mode, NORMAL is safe with write-ahead logging')
+
+    db_save_queue_size = db_config.cvar('save_queue_size', 1024, 'Maximum number of rows waiting to be saved in the background')
+    db_save_batch_size = db_config.cvar('save_batch_size', 256, 'Maximum number of rows saved in one background batch')
+
 
 with ConfigManager('herowars/xp', cvar_prefix='hw_xp_', indention=0) as xp_config:
     xp_formula_base = xp_config.cvar('formula_base', 80, 'Base XP required to level up')
@@ -0,0 +1,171 @@
+# Python imports
+import heapq
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Source.Python imports
+from listeners import OnLevelEnd, OnTick
+from messages.base import HudMsg
+from translations.strings import TranslationStrings
+
+# Hero-Wars imports
+from .utils import create_translation_string
+
+
+class TickClock:
+    """Wall clock that's read once per server tick.
+
+    Everything running during the same tick sees the same time,
+    and reading the clock doesn't need a system call.
+    """
+
+    def __init__(self):
+        self.now = time.time()
+
+    def tick(self):
+        self.now = time.time()
+
+
+clock = TickClock()
+
+
+class Cooldown:
+    """A cooldown whose value lowers with time."""
+
+    def __init__(self, value: float=0.0):
+        self._value = value + clock.now
+        self._reserved = False
+
+    @property
+    def expires_at(self) -> float:
+        """Time at which the cooldown ends, infinite if it's reserved."""
+        if self._reserved:
+            return math.inf
+        return self._value
+
+    @property
+    def remaining(self) -> float:
+        if self._reserved:
+            return math.inf
+        return max(self._value - clock.now, 0)
+
+    @remaining.setter
+    def remaining(self, value: float):
+        self._value = value + clock.now
+
+    def reserve(self):
+        """Flag the cooldown as 'reserved'.
+
+        The cooldown will be flagged as if it were already on-cooldown,
+        without actually starting the cooldown.
+        """
+        self._reserved = True
+
+    def start(self, duration: float):
+        """Start the cooldown."""
+        self._reserved = False
+        self.remaining = duration
+
+
+class CooldownScheduler:
+    """Display players' cooldowns on their HUD.
+
+    All the displayed cooldowns share one min-heap of the times
+    at which a player's HUD changes next, i.e. when a cooldown
+    ticks down to its next whole second or runs out.
+    The HUD is only sent when its displayed values change.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int]] = []
+        self._due: Dict[int, float] = {}  # Each player's latest heap entry, older ones are stale
+        self._displays: Dict[int, Dict[Cooldown, Optional[TranslationStrings]]] = {}
+        self._shown: Dict[int, Tuple] = {}
+        self._hud_msg = HudMsg('', y=0.9, hold_time=1.5)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def show(self, index: int, cooldown: Cooldown, name: Optional[TranslationStrings]=None):
+        """Display a cooldown on a player's HUD until it runs out."""
+        self._displays.setdefault(index, {})[cooldown] = name
+        self._refresh(index, clock.now)
+
+    def discard(self, index: int):
+        """Stop displaying cooldowns to a player."""
+        self._displays.pop(index, None)
+        self._shown.pop(index, None)
+        self._due.pop(index, None)
+
+    def clear(self):
+        self._heap.clear()
+        self._due.clear()
+        self._displays.clear()
+        self._shown.clear()
+
+    def run(self, now: float):
+        """Refresh the HUDs of all the players due by `now`."""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, index = heapq.heappop(heap)
+            if self._due.get(index) == due:
+                del self._due[index]
+                self._refresh(index, now)
+
+    def _refresh(self, index: int, now: float):
+        """Send a player's HUD if it changed and schedule its next change."""
+        displays = self._displays.get(index)
+        if not displays:
+            return
+        shown = []
+        next_change = math.inf
+        for cooldown, name in list(displays.items()):
+            remaining = cooldown.expires_at - now
+            if remaining <= 0 or remaining == math.inf:
+                del displays[cooldown]
+                continue
+            seconds = math.ceil(remaining)
+            shown.append((name, seconds))
+            # The displayed value drops to seconds - 1 once remaining reaches it
+            next_change = min(next_change, now + remaining - (seconds - 1))
+
+        key = tuple((id(name), seconds) for name, seconds in shown)
+        if key != self._shown.get(index, ()):
+            self._send(index, shown)
+            self._shown[index] = key
+
+        if not displays:
+            self.discard(index)
+        elif self._due.get(index, math.inf) > next_change:
+            self._due[index] = next_change
+            heapq.heappush(self._heap, (next_change, index))
+
+    def _send(self, index: int, shown: List[Tuple[Optional[TranslationStrings], int]]):
+        lines = []
+        tokens = {}
+        for i, (name, seconds) in enumerate(shown):
+            if name is None:
+                lines.append(f'{{seconds{i}}}')
+            else:
+                lines.append(f'{{name{i}}}: {{seconds{i}}}')
+                tokens[f'name{i}'] = name
+            tokens[f'seconds{i}'] = seconds
+        # An empty message clears the HudMsg
+        self._hud_msg.message = create_translation_string('\n'.join(lines), **tokens)
+        self._hud_msg.send(index)
+
+
+cooldown_scheduler = CooldownScheduler()
+
+
+@OnTick
+def _on_tick():
+    clock.tick()
+    if cooldown_scheduler:
+        cooldown_scheduler.run(clock.now)
+
+
+@OnLevelEnd
+def _on_level_end():
+    cooldown_scheduler.clear()
@@ -1,49 +1,13 @@
-# Site-Package imports
-from dataclasses import dataclass
-from sqlalchemy import Boolean, create_engine, Column, ForeignKey, Integer, MetaData, Table, Text
-from sqlalchemy.engine.url import URL
-from sqlalchemy.sql import select
-from sqlalchemy.sql.expression import bindparam
+# Python imports
+from typing import ContextManager, Dict, Iterable, List
 
 # Hero-Wars imports
 from . import config
+from .backends import Backend, create_backend, LeaderboardRow, PlayerDataRow, Records
 from .entities import Hero
 from .hero_types import hero_types
 from .player import Player, UpgradeSkillsPopup
-
-
-_metadata = MetaData()
-
-
-@dataclass
-class _Tables:
-    player: Table
-    hero: Table
-    skill: Table
-
-
-_t = _Tables(
-    player=Table('player', _metadata,
-        Column('steamid', Text, primary_key=True),
-        Column('hero_id', Integer, ForeignKey('hero.id')),
-        # Player Settings
-        Column('inspect_to_ult', Boolean, nullable=False, default=True),
-        Column('upgrade_skills_popup', Integer, nullable=False, default=1),
-    ),
-    hero=Table('hero', _metadata,
-        Column('id', Integer, primary_key=True),
-        Column('key', Text, nullable=False),
-        Column('level', Integer),
-        Column('xp', Integer),
-        Column('steamid', Integer, ForeignKey('player.steamid'), nullable=False),
-    ),
-    skill=Table('skill', _metadata,
-        Column('id', Integer, primary_key=True),
-        Column('key', Text, nullable=False),
-        Column('level', Integer),
-        Column('hero_id', Integer, ForeignKey('hero.id'), nullable=False),
-    ),
-)
+from .profiler import profiler
 
 
 url_dict = {}
@@ -53,128 +17,209 @@ for key, cvar in config.db_url.items():
         value = None
     url_dict[key] = value
 
-engine = create_engine(URL(**url_dict))
-_metadata.create_all(bind=engine)
+backend: Backend = create_backend(url_dict, sqlite_synchronous=config.db_sqlite_synchronous.get_string())
 
 
-def create_player_data(player: Player):
-    with engine.connect() as conn:
-        conn.execute(
-            _t.player.insert().values(
-                steamid=player.steamid,
-                inspect_to_ult=player.settings.inspect_to_ult,
-            )
-        )
+def transaction() -> ContextManager:
+    """Share one transaction between the database helpers called inside the block.
 
-        create_hero_data(player.hero, steamid=player.steamid)
+    Lets a whole logical operation commit once on one connection.
+    """
+    return backend.transaction()
 
-        conn.execute(
-            _t.player.update()\
-                .where(_t.player.c.steamid==player.steamid)\
-                .values(hero_id=player.hero._db_id)
-        )
+
+@profiler.timed('database')
+def create_player_data(player: Player):
+    with transaction():
+        backend.insert_player(player.steamid, {
+            'inspect_to_ult': player.settings.inspect_to_ult,
+            'name': player.name,
+            'total_level': player.total_level(),
+        })
+        _create_hero_data(player.hero, steamid=player.steamid)
+        backend.write({('player', player.steamid): {'hero_id': player.hero._db_id}})
+        player._saved_row = {
+            'hero_id': player.hero._db_id,
+            'inspect_to_ult': player.settings.inspect_to_ult,
+            'name': player.name,
+            'total_level': player.total_level(),
+        }
 
 
 def load_player_data(player: Player) -> bool:
-    with engine.connect() as conn:
-        player_result = conn.execute(
-            select([_t.player]).where(_t.player.c.steamid==player.steamid)
-        )
-        player_info = player_result.first()
-        if player_info is None:
-            return False
-        player.settings.inspect_to_ult = player_info.inspect_to_ult
-        player.settings.upgrade_skills_popup = UpgradeSkillsPopup(player_info.upgrade_skills_popup)
-
-        heroes_result = conn.execute(
-            select([_t.hero]).where(_t.player.c.steamid==player.steamid)
-        )
-        for hero_info in heroes_result:
-            hero_type = hero_types.get(hero_info.key)
+    """Load the player's settings, heroes, and their skills.
+
+    Returns False if the player doesn't exist in the database.
+    """
+    return apply_player_data(player, fetch_player_data(player.steamid))
+
+
+@profiler.timed('database')
+def fetch_player_data(steamid: str) -> List[PlayerDataRow]:
+    """Fetch the rows of a player's settings, heroes, and skills.
+
+    Doesn't touch any game objects, so it's safe to call from other threads.
+    """
+    return backend.fetch_player(steamid)
+
+
+def apply_player_data(player: Player, rows: List[PlayerDataRow]) -> bool:
+    """Apply fetched rows to a player.
+
+    Only the active hero's skills are created, the other heroes
+    keep their skill rows until they're first used.
+    Returns False if there were no rows for the player.
+    """
+    if not rows:
+        return False
+    player._saved_row = {
+        'hero_id': rows[0].active_hero_id,
+        'inspect_to_ult': rows[0].inspect_to_ult,
+        'upgrade_skills_popup': rows[0].upgrade_skills_popup,
+    }
+    player.settings.inspect_to_ult = rows[0].inspect_to_ult
+    player.settings.upgrade_skills_popup = UpgradeSkillsPopup(rows[0].upgrade_skills_popup)
+
+    heroes: Dict[int, Hero] = {}
+    for row in rows:
+        if row.hero_id is None:
+            continue
+        if row.hero_id not in heroes:
+            hero_type = hero_types.get(row.hero_key)
             if hero_type is None:
                 continue
-            hero = Hero(hero_type, level=hero_info.level, xp=hero_info.xp, db_id=hero_info.id)
-            player.heroes[hero_type.key] = hero
-
-            if hero_info.id == player_info.hero_id:
+            hero = Hero(hero_type, level=row.hero_level, xp=row.hero_xp, db_id=row.hero_id)
+            heroes[row.hero_id] = hero
+            player.add_hero(hero)
+            if row.hero_id == row.active_hero_id:
                 player.hero = hero
 
-        return True
+        if row.skill_key is not None:
+            heroes[row.hero_id]._skill_rows[row.skill_key] = (row.skill_level, row.skill_id)
+
+    if player.hero:
+        player.hero._create_skills()
+    return True
+
+
+def snapshot_player_data(player: Player) -> Records:
+    """Snapshot the player's unsaved state into plain records.
+
+    The records don't reference the player or its entities,
+    so they can be written later from another thread.
+    Rows that haven't changed since the last snapshot are skipped,
+    and changed rows only contain the changed columns.
+    Every hero is snapshotted, since inactive heroes can gain XP too.
+    """
+    row = {
+        'hero_id': player.hero._db_id,
+        'inspect_to_ult': player.settings.inspect_to_ult,
+        'upgrade_skills_popup': player.settings.upgrade_skills_popup.value,
+        'name': player.name,
+        'total_level': player.total_level(),
+    }
+    changed = {
+        column: value
+        for column, value in row.items()
+        if column not in player._saved_row or player._saved_row[column] != value
+    }
+    player._saved_row = row
+
+    records = {}
+    if changed:
+        records['player', player.steamid] = changed
+    for hero in player.heroes.values():
+        if hero._db_id is not None:  # Inserted with its current state once used
+            records.update(snapshot_hero_data(hero))
+    return records
+
+
+def snapshot_hero_data(hero: Hero) -> Records:
+    """Snapshot the hero's and its skills' unsaved state into plain records."""
+    records = {}
+    if hero.dirty_fields:
+        records['hero', hero._db_id] = {
+            field: getattr(hero, field)
+            for field in hero.dirty_fields
+        }
+        hero.mark_clean()
+    for skill in hero.skills:
+        if skill.dirty_fields and not skill.passive and skill._db_id is not None:
+            records['skill', skill._db_id] = {
+                field: getattr(skill, field)
+                for field in skill.dirty_fields
+            }
+            skill.mark_clean()
+    return records
+
+
+def snapshot_players_data(players: Iterable[Player]) -> Records:
+    """Snapshot the unsaved state of multiple players into one set of records."""
+    records = {}
+    for player in players:
+        records.update(snapshot_player_data(player))
+    return records
+
+
+@profiler.timed('database')
+def write_snapshot(records: Records):
+    """Write snapshotted records to the database in a single transaction."""
+    backend.write(records)
 
 
-def load_skills_data(hero: Hero):
-    with engine.connect() as conn:
-        skills = {skill.key: skill for skill in hero.skills if not skill.passive}
-        skills_result = conn.execute(
-            select([_t.skill]).where(_t.hero.c.id==hero._db_id)
-        )
-        for skill_info in skills_result:
-            skill = skills.get(skill_info.key)
-            if skill:
-                skill.level = skill_info.level
-                skill._db_id = skill_info.id
+def save_player_data(player: Player):
+    write_snapshot(snapshot_player_data(player))
 
 
-def save_player_data(player: Player):
-    with engine.connect() as conn:
-        conn.execute(
-            _t.player.update()\
-                .where(_t.player.c.steamid==player.steamid)\
-                .values(
-                    hero_id=player.hero._db_id,
-                    inspect_to_ult=player.settings.inspect_to_ult,
-                    upgrade_skills_popup=player.settings.upgrade_skills_popup.value,
-                )
-        )
-        save_hero_data(player.hero)
+def save_players_data(players: Iterable[Player]):
+    """Save all the players' unsaved data in one transaction."""
+    write_snapshot(snapshot_players_data(players))
 
 
+@profiler.timed('database')
 def create_hero_data(hero: Hero, steamid: str):
-    with engine.connect() as conn:
-        result = conn.execute(
-            _t.hero.insert().values(
-                key=hero.key,
-                level=hero.level,
-                xp=hero.xp,
-                steamid=steamid,
-            )
-        )
-        hero._db_id = result.inserted_primary_key[0]
-
-        skills = [skill for skill in hero.skills if not skill.passive]
-        skills_result = conn.execute(
-            _t.skill.insert().values([
-                {
-                    'key': skill.key,
-                    'level': skill.level,
-                    'hero_id': hero._db_id,
-                }
-                for skill in skills
-            ])
-        )
-        last_id = skills_result.inserted_primary_key[0]
-        first_id = last_id - len(skills) + 1
-        ids = range(first_id, last_id + 1)
-        for skill, skill_id in zip(skills, ids):
-            skill._db_id = skill_id
+    _create_hero_data(hero, steamid)
+
+
+def _create_hero_data(hero: Hero, steamid: str):
+    skills = [skill for skill in hero.skills if not skill.passive]
+    hero._db_id, skill_ids = backend.insert_hero(
+        steamid,
+        {'key': hero.key, 'level': hero.level, 'xp': hero.xp},
+        [{'key': skill.key, 'level': skill.level} for skill in skills],
+    )
+    for skill, skill_id in zip(skills, skill_ids):
+        skill._db_id = skill_id
+        skill.mark_clean()
+    hero.mark_clean()
+
+
+@profiler.timed('database')
+def create_skill_data(hero: Hero):
+    """Insert rows for the hero's skills that don't have one yet.
+
+    Needed when a reloaded hero gains new skills.
+    """
+    skills = [skill for skill in hero.skills if skill._db_id is None and not skill.passive]
+    if not skills:
+        return
+    skill_ids = backend.insert_skills(
+        hero._db_id,
+        [{'key': skill.key, 'level': skill.level} for skill in skills],
+    )
+    for skill, skill_id in zip(skills, skill_ids):
+        skill._db_id = skill_id
+        skill.mark_clean()
 
 
 def save_hero_data(hero: Hero):
-    with engine.connect() as conn:
-        conn.execute(
-            _t.hero.update()\
-                .where(_t.hero.c.id==hero._db_id)\
-                .values(key=hero.key, level=hero.level, xp=hero.xp)
-        )
-        conn.execute(
-            _t.skill.update()\
-                .where(_t.skill.c.id==bindparam('id_'))\
-                .values(level=bindparam('level')),
-            [
-                {
-                    'level': skill.level,
-                    'id_': skill._db_id,
-                }
-                for skill in hero.skills if not skill.passive
-            ]
-        )
+    write_snapshot(snapshot_hero_data(hero))
+
+
+@profiler.timed('database')
+def fetch_leaderboard(offset: int=0, limit: int=10) -> List[LeaderboardRow]:
+    """Fetch a page of players with the highest total levels.
+
+    Reads straight from the total level index without loading any players.
+    """
+    return backend.fetch_leaderboard(offset, limit)
@@ -1,4 +1,5 @@
 # Hero-Wars forward imports
+from .callbacks import EventCallback
 from .hero import Hero
 from .skill import Skill
 from .type_objects import HeroType, SkillType
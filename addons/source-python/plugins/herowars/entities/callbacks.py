@@ -0,0 +1,57 @@
+# Python imports
+import inspect
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class EventCallback:
+    """Event callback that's only passed the arguments it declares.
+
+    The callback's signature is inspected once, after which
+    invoke() passes the player, hero, skill, and event arguments
+    positionally, without building a keyword dictionary per call.
+    A variable keyword parameter (e.g. **rest) stays empty.
+    """
+
+    _CONTEXT = ('player', 'hero', 'skill')
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self._positional: List[Tuple[int, str, Any]] = []
+        self._keyword: List[Tuple[int, str, Any]] = []
+        for name, param in inspect.signature(func).parameters.items():
+            source = self._CONTEXT.index(name) if name in self._CONTEXT else len(self._CONTEXT)
+            if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+                self._positional.append((source, name, param.default))
+            elif param.kind == param.KEYWORD_ONLY:
+                self._keyword.append((source, name, param.default))
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.func.__qualname__})'
+
+    def invoke(self, player: Any, hero: Any, skill: Any, eargs: Dict[str, Any]):
+        """Invoke the callback with only the arguments it declares."""
+        context = (player, hero, skill)
+        args = _resolve(self._positional, context, eargs)
+        if self._keyword:
+            names = [param[1] for param in self._keyword]
+            return self.func(*args, **dict(zip(names, _resolve(self._keyword, context, eargs))))
+        return self.func(*args)
+
+
+def _resolve(params: List[Tuple[int, str, Any]], context: Tuple[Any, Any, Any], eargs: Dict[str, Any]) -> List[Any]:
+    """Resolve parameters' values from the context and the event arguments."""
+    values = []
+    for source, name, default in params:
+        if source < len(context):
+            values.append(context[source])
+        elif default is _EMPTY:
+            values.append(eargs[name])
+        else:
+            values.append(eargs.get(name, default))
+    return values
+
+
+_EMPTY = inspect.Parameter.empty
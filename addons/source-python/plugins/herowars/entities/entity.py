@@ -1,19 +1,17 @@
 # Python imports
 import collections
-import math
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
 # Source.Python imports
 from effects.base import TempEntity
-from listeners.tick import Repeat
-from messages.base import HudMsg
-from messages.colors.saytext2 import GREEN, ORANGE, WHITE
-from messages import SayText2
+from messages.colors.saytext2 import ORANGE, WHITE
 from players.entity import Player
 from translations.strings import TranslationStrings
 
 # Hero-Wars imports
-from ..utils import Cooldown, create_translation_string
+from ..chat_queue import chat_queue
+from ..cooldowns import Cooldown, cooldown_scheduler
+from ..timers import TimerGroup
 from .type_objects import EntityType
 
 
@@ -37,8 +35,9 @@ class Entity:
         self._type_object = type_object
         self._level = level
         self._db_id = db_id
-        self._temp_entities: Dict[str, Tuple[TempEntity, str]] = {}
+        self._dirty: Set[str] = set()
         self._cooldowns = collections.defaultdict(Cooldown)
+        self.timers = TimerGroup()
 
     key: str = type_object_property('key')
     author: Optional[str] = type_object_property('author')
@@ -64,21 +63,31 @@ class Entity:
             raise ValueError('level must be non-negative')
         if value > self.max_level:
             raise ValueError('level must not exceed max_level')
-        self._level = value
+        if value != self._level:
+            self._level = value
+            self._dirty.add('level')
+
+    @property
+    def dirty_fields(self) -> Set[str]:
+        """Names of the persistent fields changed since the last save."""
+        return self._dirty
+
+    def mark_dirty(self, *fields: str):
+        """Flag fields as changed, e.g. 'key' after swapping the type object."""
+        self._dirty.update(fields)
+
+    def mark_clean(self):
+        """Flag the entity as being in sync with the database."""
+        self._dirty.clear()
 
     def __repr__(self) -> str:
         return f'{type(self).__name__}(name="{self.name["en"]}", level={self.level}, db_id={self._db_id})'
 
-    def invoke_callback(self, event_name: str, eargs: Dict[str, Any]):
-        """Invoke the event callback for an event, if any."""
-        if event_name in self.event_callbacks:
-            self.event_callbacks[event_name](**eargs)
-
     def effect(self, key: str='effect', recipients: Tuple[int]=(), **kwargs):
         """Create a temp entity effect from an effect key.
 
-        Fetches the data from the temp_entities dictionary,
-        which in turn is populated from the effects dictionary.
+        The temp entity is prepared from the effects dictionary
+        beforehand, so only the per-call attributes are set here.
         """
         temp_entity = self._type_object.get_temp_entity(key)
         for name, attr in kwargs.items():
@@ -87,15 +96,10 @@ class Entity:
 
     def current(self, key: str) -> Any:
         """Fetch a variable's value for the entity's current level."""
-        raw = self.variables[key]
-        if isinstance(raw, dict):
-            if 'per_level' in raw:
-                base = raw.get('base', 0)
-                return base + self.level * raw['per_level']
-        elif isinstance(raw, (list, tuple)):
-            index = min(self.level, len(raw)) - 1
-            return raw[index]
-        return raw
+        try:
+            return self._type_object._variable_tables[key][self._level]
+        except (KeyError, IndexError):
+            return self._type_object.variable_at(key, self._level)
 
     def off_cooldown(self, key: str='cooldown', auto_reserve=True) -> bool:
         """Check if the skill's cooldown is off.
@@ -120,23 +124,18 @@ class Entity:
         return cooldown
 
     def send_cooldown(self, player: Player, key: str='cooldown'):
-        """Send a cooldown HudMsg to a player."""
-        hud_msg = HudMsg('{remaining}', y=0.9, hold_time=1)
-        repeat = Repeat(self._send_cooldown_tick, cancel_on_level_end=True)
-        repeat.args = (hud_msg, player.index, key, repeat)
-        repeat.start(1)
-
-    def _send_cooldown_tick(self, hud_msg: HudMsg, player_index: int, key: str, repeat: Repeat):
-        """Send one tick of the cooldown to a player."""
-        remaining = math.ceil(self._cooldowns[key].remaining)
-        if remaining > 0:
-            hud_msg.send(player_index, remaining=remaining)
-        else:
-            hud_msg.send(player_index, remaining='')  # Empty message clears the HudMsg
-            repeat.stop()
+        """Display a cooldown on a player's HUD until it runs out."""
+        cooldown_scheduler.show(player.index, self._cooldowns[key], self.name)
+
+    def cancel_timers(self):
+        """Cancel all the timers the entity has started.
+
+        Pending delays are run right away, so effects they would end don't linger.
+        """
+        self.timers.cancel_all()
 
     def send_message(self, player: Player, string: TranslationStrings, **tokens: Dict[str, Any]):
-        """Send a message to a player with the entity name as a prefix.
+        """Queue a message to a player with the entity name as a prefix.
 
         Also replace all the tokens with orange values.
         """
@@ -144,11 +143,7 @@ class Entity:
             key: f'{ORANGE}{value}{WHITE}'
             for key, value in tokens.items()
         }
-        SayText2(create_translation_string(
-            f'[{GREEN}{{name}}{WHITE}] {{message}}',
-            name=self.name,
-            message=string.tokenized(**color_tokens),
-        )).send(player.index)
+        chat_queue.put(player.index, string, prefix=self.name, **color_tokens)
 
     def send_string(self, player: Player, key: str, **tokens: Dict[str, Any]):
         """Fetch and send a string from the entity's strings dictionary.
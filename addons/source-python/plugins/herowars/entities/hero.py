@@ -1,6 +1,6 @@
 # Python impors
 import math
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 # Hero-Wars imports
 from .. import config
@@ -8,6 +8,72 @@ from .entity import Entity
 from .skill import Skill
 
 
+def _xp_for_levels(level: int, count: int, base: int, per_level: int) -> int:
+    """Get the XP needed to gain `count` levels starting from `level`.
+
+    Level `n` requires `base + n * per_level` XP,
+    so the total is the sum of an arithmetic series.
+    """
+    return count * (base + level * per_level) + per_level * count * (count - 1) // 2
+
+
+def _solve_count(first: int, per_level: int, xp: int) -> int:
+    """Estimate how many levels `xp` is worth, when the first costs `first`."""
+    if per_level == 0:
+        return xp // first if first > 0 else 0
+    # Solve per_level / 2 * n^2 + (first - per_level / 2) * n = xp for n
+    b = first - per_level / 2
+    discriminant = b * b + 2 * per_level * xp
+    if discriminant < 0:
+        return 0
+    return max(int((-b + math.sqrt(discriminant)) / per_level), 0)
+
+
+def solve_level(level: int, xp: int, base: int, per_level: int, max_level=math.inf) -> Tuple[int, int]:
+    """Get the level and leftover XP of a hero with `xp` XP at `level`.
+
+    Works in constant time, no matter how many levels are gained or lost.
+    Negative XP takes levels away, but never below level 0.
+    """
+    if xp < 0:
+        # Find the fewest levels to lose to get back to non-negative XP
+        lost = 0
+        if level > 0:
+            lost = min(_solve_count(base + (level - 1) * per_level, -per_level, -xp), level)
+        while lost > 0 and xp + _xp_for_levels(level - lost + 1, lost - 1, base, per_level) >= 0:
+            lost -= 1
+        while lost < level and xp + _xp_for_levels(level - lost, lost, base, per_level) < 0:
+            lost += 1
+        xp += _xp_for_levels(level - lost, lost, base, per_level)
+        level -= lost
+        if xp < 0:  # Not even level 0 covers the loss
+            return 0, 0
+        return level, xp
+
+    room = max_level - level
+    if room <= 0:
+        return level, xp
+    first = base + level * per_level
+    if first <= 0:
+        if per_level <= 0:  # No level ever costs anything, jump straight to the top
+            return (max_level, xp) if room != math.inf else (level, xp)
+        # Levels are free until their cost turns positive, gain them all
+        free = min(-first // per_level + 1, room)
+        xp -= _xp_for_levels(level, free, base, per_level)
+        level += free
+        room -= free
+        if room <= 0:
+            return level, xp
+        first = base + level * per_level
+    gained = min(_solve_count(first, per_level, xp), room)
+    # Correct any floating point error in the estimate
+    while gained > 0 and _xp_for_levels(level, gained, base, per_level) > xp:
+        gained -= 1
+    while gained < room and _xp_for_levels(level, gained + 1, base, per_level) <= xp:
+        gained += 1
+    return level + gained, xp - _xp_for_levels(level, gained, base, per_level)
+
+
 class Hero(Entity):
     """Hero entity manages skills and XP."""
 
@@ -15,10 +81,22 @@ class Hero(Entity):
         super().__init__(*args, **kwargs)
         self._xp = xp
         self.skills: List[Skill] = []
+        self._skill_rows: Dict[str, Tuple[int, int]] = {}  # Saved levels and ids of skills not created yet
+        self._owner = None  # Player whose total level tracks this hero
 
     def _create_skills(self) -> List[Skill]:
-        """Create the skill entities from their type objects."""
+        """Create the skill entities from their type objects.
+
+        Loads the hero's code first if it hasn't been loaded yet,
+        and applies the saved levels of the skills.
+        """
+        self._type_object.materialize()
         self.skills.extend([Skill(skill_type) for skill_type in self._type_object.skill_types])
+        for skill in self.skills:
+            if skill.key in self._skill_rows and not skill.passive:
+                skill.level, skill._db_id = self._skill_rows[skill.key]
+                skill.mark_clean()
+        self._skill_rows.clear()
 
     @property
     def required_xp(self) -> int:
@@ -36,24 +114,39 @@ class Hero(Entity):
 
     @xp.setter
     def xp(self, value: int):
-        self._xp = value
-        try:
-            while self.xp < 0:
-                self._level -= 1
-                self._xp += self.required_xp
-
-            while self.xp >= self.required_xp:
-                self._xp -= self.required_xp
-                self._level += 1
+        old_level = self._level
+        if value != self._xp:
+            self._dirty.add('xp')
+        self._level, self._xp = solve_level(
+            self._level,
+            value,
+            config.xp_formula_base.get_int(),
+            config.xp_formula_per_level.get_int(),
+            self.max_level,
+        )
+        if self._level != old_level:
+            self._level_changed(old_level)
 
-        except ValueError: # Invalid level value (<0 or >max_level)
-            self._xp = 0
+    def grant_xp(self, amount: int) -> int:
+        """Give XP to the hero, returning the number of levels gained."""
+        old_level = self._level
+        self.xp += amount
+        return self._level - old_level
 
     @Entity.level.setter
     def level(self, value: int):
-        self._level = value
+        if value != self._level:
+            old_level = self._level
+            self._level = value
+            self._level_changed(old_level)
         if self.xp >= self.required_xp:
             self._xp = 0
+            self._dirty.add('xp')
+
+    def _level_changed(self, old_level: int):
+        self._dirty.add('level')
+        if self._owner is not None:
+            self._owner._total_level += self._level - old_level
 
     @property
     def skill_points(self) -> int:
@@ -78,6 +171,12 @@ class Hero(Entity):
             and skill in self.skills
         )
 
+    def cancel_timers(self):
+        """Cancel all the timers of the hero and its skills."""
+        super().cancel_timers()
+        for skill in self.skills:
+            skill.cancel_timers()
+
     def reset_skills(self):
         """Reset all hero's skills to level 0."""
         for skill in self.skills:
@@ -1,6 +1,6 @@
 # Python imports
 import math
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Site-Package imports
 from dataclasses import dataclass, field
@@ -11,6 +11,23 @@ from translations.strings import TranslationStrings
 
 # Hero-Wars imports
 from ..precache import get_model
+from ..utils import split_translation_string
+
+
+# Highest max_level to precompute variable tables for
+_MAX_TABLE_LEVEL = 1024
+
+
+def _variable_value(raw: Any, level: int) -> Any:
+    """Compute a data variable's value for a level from its raw data."""
+    if isinstance(raw, dict):
+        if 'per_level' in raw:
+            base = raw.get('base', 0)
+            return base + level * raw['per_level']
+    elif isinstance(raw, (list, tuple)):
+        index = min(level, len(raw)) - 1
+        return raw[index]
+    return raw
 
 
 @dataclass
@@ -54,17 +71,49 @@ class EntityType:
     # Internal cache for the temp entity objects for visual effects.
     _temp_entities: Dict[str, TempEntity] = field(default_factory=dict)
 
+    # Internal per-level lookup tables of the data variables' values.
+    _variable_tables: Dict[str, List[Any]] = field(default_factory=dict)
+
+    # Internal counter bumped whenever the variables are recompiled.
+    _variables_version: int = 0
+
+    # Internal cache of the description and its rows, with the variables' version.
+    _description_cache: Optional[Tuple[int, TranslationStrings, List[TranslationStrings]]] = None
+
+    def __post_init__(self):
+        self.compile_variables()
+
     @property
     def name(self) -> TranslationStrings:
         return self.strings['name']
 
     @property
     def description(self) -> TranslationStrings:
-        self.strings['description'].tokens.update({
-            variable: self._variable_range_string(variable)
-            for variable in self.variables.keys()
-        })
-        return self.strings['description']
+        return self._cached_description()[0]
+
+    @property
+    def description_rows(self) -> List[TranslationStrings]:
+        """The description split into one translation string per line."""
+        return self._cached_description()[1]
+
+    def _cached_description(self) -> Tuple[TranslationStrings, List[TranslationStrings]]:
+        """Fill in the description's variable ranges and split it into rows.
+
+        Only redone after the variables are recompiled.
+        """
+        cache = self._description_cache
+        if cache is None or cache[0] != self._variables_version:
+            description = self.strings['description']
+            description.tokens.update({
+                variable: self._variable_range_string(variable)
+                for variable in self.variables.keys()
+            })
+            cache = self._description_cache = (
+                self._variables_version,
+                description,
+                split_translation_string(description),
+            )
+        return cache[1], cache[2]
 
     def _variable_range_string(self, key: str) -> str:
         """Get a string of a data variable's range.
@@ -72,29 +121,65 @@ class EntityType:
         Essentially a string of format "{min_value} - {max_value}".
         """
         raw = self.variables[key]
-        if isinstance(raw, dict):
-            if 'per_level' in raw:
-                base = raw.get('base', 0)
-                start = base + raw['per_level']
-                end = base + self.max_level * raw['per_level']
-                return f'{start} - {end}'
-        elif isinstance(raw, (list, tuple)):
-            if len(raw) == self.max_level:
-                return f'{raw[0]} - {raw[self.max_level - 1]}'
+        if (
+            isinstance(raw, dict) and 'per_level' in raw
+            or isinstance(raw, (list, tuple)) and len(raw) == self.max_level
+        ):
+            return f'{self.variable_at(key, 1)} - {self.variable_at(key, self.max_level)}'
         return str(raw)
 
+    def compile_variables(self):
+        """Precompute the data variables' values for every level.
+
+        Must be called again if the variables are changed.
+        Entities with no maximum level compute their values on demand.
+        """
+        self._variables_version += 1
+        self._variable_tables.clear()
+        if self.max_level > _MAX_TABLE_LEVEL:
+            return
+        levels = range(self.max_level + 1)
+        for key, raw in self.variables.items():
+            self._variable_tables[key] = [_variable_value(raw, level) for level in levels]
+
+    def variable_at(self, key: str, level: int) -> Any:
+        """Get a data variable's value for a level."""
+        try:
+            return self._variable_tables[key][level]
+        except (KeyError, IndexError):
+            return _variable_value(self.variables[key], level)
+
+    @property
+    def temp_entities(self) -> Dict[str, TempEntity]:
+        return self._temp_entities
+
     def get_temp_entity(self, key: str) -> TempEntity:
         """Get a temp entity for an effect.
 
         Does NOT call create() on the temp entity.
         """
-        if key not in self._temp_entities:
-            params = self.effects[key].copy()
-            del params['model']
-            name = params.pop('temp_entity')
-            self._temp_entities[key] = TempEntity(name, **params)
-        temp_entity = self._temp_entities[key]
-        temp_entity.model = temp_entity.halo = get_model(self.effects[key]['model'])
+        temp_entity = self._temp_entities.get(key)
+        if temp_entity is None:
+            temp_entity = self._prepare_temp_entity(key)
+        return temp_entity
+
+    def prepare_effects(self):
+        """Build the temp entities of all the effects and set their models.
+
+        Model indexes change between maps, so this should be called
+        again once each map's models have been precached.
+        """
+        for key in self.effects:
+            self._prepare_temp_entity(key)
+
+    def _prepare_temp_entity(self, key: str) -> TempEntity:
+        params = self.effects[key].copy()
+        model = get_model(params.pop('model'))
+        name = params.pop('temp_entity')
+        temp_entity = self._temp_entities.get(key)
+        if temp_entity is None:
+            temp_entity = self._temp_entities[key] = TempEntity(name, **params)
+        temp_entity.model = temp_entity.halo = model
         return temp_entity
 
 
@@ -122,3 +207,26 @@ class HeroType(EntityType):
 
     # List of skill type objects the hero should possess.
     skill_types: List[SkillType] = field(default_factory=list)
+
+    # Loads the hero's code and skill types on first use, None once loaded.
+    loader: Optional[Callable[['HeroType'], None]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loader is None
+
+    def prepare_effects(self):
+        """Prepare the hero's and its skills' effects."""
+        super().prepare_effects()
+        for skill_type in self.skill_types:
+            skill_type.prepare_effects()
+
+    def materialize(self):
+        """Load the hero's code and skill types, unless already loaded."""
+        if self.loader is not None:
+            loader, self.loader = self.loader, None
+            try:
+                loader(self)
+            except Exception:
+                self.loader = loader
+                raise
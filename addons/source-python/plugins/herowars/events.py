@@ -11,6 +11,7 @@ from memory import make_object
 from easyevents import EasyEvents
 
 # Hero-Wars imports
+from .player import callback_listeners
 from .players import player_dict
 
 
@@ -31,10 +32,22 @@ for event_name in CUSTOM_PLAYER_EVENTS:
     events.create_event(event_name)
 
 
+_attack_listeners = callback_listeners['pre_player_attack']
+_victim_listeners = callback_listeners['pre_player_victim']
+
+
 @EntityPreHook(EntityCondition.is_player, 'on_take_damage')
 def _fire_pre_take_damage(args):
-    take_damage_info = make_object(TakeDamageInfo, args[1])
+    # Bail out early unless one of the players' heroes is listening
     victim_index = index_from_pointer(args[0])
+    victim_listens = victim_index in _victim_listeners
+    if not victim_listens and not _attack_listeners:
+        return
+    take_damage_info = make_object(TakeDamageInfo, args[1])
+    attacker_listens = take_damage_info.attacker in _attack_listeners
+    if not victim_listens and not attacker_listens:
+        return
+
     victim = player_dict[victim_index]
     try:
         attacker = player_dict[take_damage_info.attacker]
@@ -45,9 +58,10 @@ def _fire_pre_take_damage(args):
         'victim': victim,
         'take_damage_info': take_damage_info,
     }
-    if attacker is not None:
+    if attacker_listens and attacker is not None:
         events['pre_player_attack'].fire(event_args, player=attacker)
-    events['pre_player_victim'].fire(event_args, player=victim)
+    if victim_listens:
+        events['pre_player_victim'].fire(event_args, player=victim)
 
 
 @ClientCommand('+ultimate')
@@ -0,0 +1,94 @@
+# Python imports
+import hashlib
+import os
+import pickle
+import traceback
+from typing import Any, Dict, NamedTuple
+
+# Site-Package imports
+import yaml
+
+# Source.Python imports
+from path import Path
+from paths import PLUGIN_DATA_PATH
+
+
+class _CachedFile(NamedTuple):
+    mtime_ns: int
+    size: int
+    sha1: str
+    data: bytes  # Pickled, so every load gets its own copy
+
+
+class HeroCache:
+    """Persistent cache of parsed hero definition files.
+
+    Files are matched by their modification time and size,
+    falling back to a SHA-1 of their contents if those changed,
+    so touching a file without editing it doesn't re-parse it.
+    """
+
+    # Bump whenever the cached data's format changes
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._files: Dict[str, _CachedFile] = {}
+        self._used = set()
+        self._changed = False
+
+    def load(self):
+        """Load the cache from disk, starting empty if it's invalid."""
+        self._files = {}
+        if not self.path.isfile():
+            return
+        try:
+            with open(self.path, 'rb') as cache_file:
+                version, files = pickle.load(cache_file)
+        except Exception:
+            traceback.print_exc()
+            return
+        if version == self.VERSION:
+            self._files = files
+
+    def save(self):
+        """Write the cache to disk if it changed, dropping unused files."""
+        unused = self._files.keys() - self._used
+        if not self._changed and not unused:
+            return
+        for key in unused:
+            del self._files[key]
+        self.path.parent.makedirs_p()
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as cache_file:
+            pickle.dump((self.VERSION, self._files), cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self._changed = False
+
+    def clear(self):
+        self._files.clear()
+        self._used.clear()
+        self._changed = True
+
+    def load_yaml(self, path: Path) -> Any:
+        """Parse a YAML file, or fetch its contents from the cache."""
+        key = str(path)
+        self._used.add(key)
+        stat = os.stat(path)
+        cached = self._files.get(key)
+        if cached is not None and (cached.mtime_ns, cached.size) == (stat.st_mtime_ns, stat.st_size):
+            return pickle.loads(cached.data)
+
+        with open(path, 'rb') as yaml_file:
+            content = yaml_file.read()
+        sha1 = hashlib.sha1(content).hexdigest()
+        if cached is not None and cached.sha1 == sha1:
+            data = cached.data
+        else:
+            data = pickle.dumps(yaml.safe_load(content.decode('utf-8')), pickle.HIGHEST_PROTOCOL)
+        self._files[key] = _CachedFile(stat.st_mtime_ns, stat.st_size, sha1, data)
+        self._changed = True
+        return pickle.loads(data)
+
+
+hero_cache = HeroCache(PLUGIN_DATA_PATH / 'herowars' / 'hero_cache.pickle')
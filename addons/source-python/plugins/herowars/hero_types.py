@@ -1,29 +1,36 @@
 # Python imports
+import functools
+import inspect
+import sys
+import traceback
 from collections import OrderedDict
-from importlib import import_module
-from typing import Any, Callable, Dict, Tuple
+from importlib import import_module, reload
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from translations.strings import TranslationStrings
 
-# Site-Package imports
-import yaml
-
 # Source.Python imports
 from path import Path
 
 # Hero-Wars imports
 from . import config
+from .entities.callbacks import EventCallback
 from .entities.type_objects import HeroType, SkillType
+from .hero_cache import hero_cache
 from .utils import dicts_to_translation_strings
 
 
-def _build_callbacks(obj: Any) -> Tuple[Callable, Callable]:
+def _build_callbacks(obj: Any) -> Tuple[Callable, Dict[str, EventCallback]]:
+    # Only functions defined by the hero count, not imported helpers
+    module_name = obj.__name__ if inspect.ismodule(obj) else obj.__module__
     init_callback = None
     event_callbacks = {}
     for name, attr in vars(obj).items():
+        if not inspect.isfunction(attr) or attr.__module__ != module_name:
+            continue
         if name == 'init':
             init_callback = attr
         elif not name.startswith('_'):
-            event_callbacks[name] = attr
+            event_callbacks[name] = EventCallback(attr)
     return init_callback, event_callbacks
 
 
@@ -32,22 +39,46 @@ def _build_hero_types(root: Path) -> Dict[str, HeroType]:
     for path in root.dirs():
         hero_type = _build_hero_type(path)
         hero_types.append(hero_type)
+        hero_paths[hero_type.key] = path
     hero_types.sort(key=lambda hero: hero.required_level)
     return OrderedDict((hero_type.key, hero_type) for hero_type in hero_types)
 
 
 def _build_hero_type(path: Path) -> HeroType:
+    """Build a hero type with only the metadata menus need.
+
+    The code and skill types are loaded by `_load_hero_code()`
+    when the hero type is first materialized.
+    """
     # Load data.yml
-    with open(path / 'data.yml', encoding='utf-8') as data_file:
-        hero_data = yaml.safe_load(data_file)
+    hero_data = hero_cache.load_yaml(path / 'data.yml')
+
+    # Load strings.yml
+    strings = hero_cache.load_yaml(path / 'strings.yml')
+
+    # Leave skills for later
+    hero_data.pop('skill_defaults', None)
+    hero_data.pop('skills', None)
+    strings.pop('skills', None)
+
+    # Create HeroType
+    if 'key' not in hero_data:
+        hero_data['key'] = path.name
+    return HeroType(
+        strings=dicts_to_translation_strings(strings),
+        loader=functools.partial(_load_hero_code, path),
+        **hero_data,
+    )
+
+
+def _load_hero_code(path: Path, hero_type: HeroType):
+    """Import a hero's code and build its skill types."""
+    hero_data = hero_cache.load_yaml(path / 'data.yml')
+    strings = hero_cache.load_yaml(path / 'strings.yml')
 
     # Load code.py
     code_module = import_module(f'herowars.heroes.{path.name}.code')
 
-    # Load strings.yml
-    with open(path / 'strings.yml', encoding='utf-8') as strings_file:
-        strings = yaml.safe_load(strings_file)
-
     # Separate skills's data from hero's data
     skill_defaults = hero_data.pop('skill_defaults', {})
     skills_data = hero_data.pop('skills')
@@ -57,8 +88,7 @@ def _build_hero_type(path: Path) -> HeroType:
     skills_translations = {
         skill_name: dicts_to_translation_strings(skill_strings)
         for skill_name, skill_strings in skills_strings.items()
-    } 
-    hero_translations = dicts_to_translation_strings(strings)
+    }
 
     # Create skill types
     skill_types = []
@@ -78,18 +108,64 @@ def _build_hero_type(path: Path) -> HeroType:
             **skill_data,
         ))
 
-
-    # Create HeroType
-    if 'key' not in hero_data:
-        hero_data['key'] = path.name
-    hero_init, hero_events = _build_callbacks(code_module)
-    return HeroType(
-        strings=hero_translations,
-        skill_types=skill_types,
-        init_callback=hero_init,
-        event_callbacks=hero_events,
-        **hero_data,
-    )
-
-
+    hero_type.skill_types = skill_types
+    hero_type.init_callback, hero_type.event_callbacks = _build_callbacks(code_module)
+    for listener in _load_listeners:
+        listener(hero_type)
+
+
+_load_listeners: List[Callable[[HeroType], None]] = []
+
+
+def on_hero_type_loaded(callback: Callable[[HeroType], None]) -> Callable[[HeroType], None]:
+    """Decorate a function to be called whenever a hero type is materialized."""
+    _load_listeners.append(callback)
+    return callback
+
+
+def rebuild_hero_cache():
+    """Re-parse every hero's definition files into a fresh cache."""
+    hero_cache.clear()
+    for path in Path(config.heroes_dir.get_string()).dirs():
+        hero_cache.load_yaml(path / 'data.yml')
+        hero_cache.load_yaml(path / 'strings.yml')
+    hero_cache.save()
+
+
+def reload_hero_type(path: Path) -> Tuple[Optional[HeroType], HeroType]:
+    """Rebuild a hero type from its files, replacing it in `hero_types`.
+
+    The new hero type's code is re-imported and materialized
+    if the old one was loaded. If building it fails,
+    the old hero type stays in place.
+    Returns the old hero type, if any, and the new one.
+    """
+    old_key = next((key for key, hero_path in hero_paths.items() if hero_path == path), None)
+    old = hero_types.get(old_key)
+    new = _build_hero_type(path)
+    if old is not None and old.loaded:
+        module = sys.modules.get(f'herowars.heroes.{path.name}.code')
+        if module is not None:
+            reload(module)
+        new.materialize()
+
+    if old is not None and old.key == new.key and old.required_level == new.required_level:
+        hero_types[new.key] = new
+    else:
+        hero_types.pop(old_key, None)
+        hero_paths.pop(old_key, None)
+        hero_types[new.key] = new
+        ordered = sorted(hero_types.values(), key=lambda hero: hero.required_level)
+        hero_types.clear()
+        hero_types.update((hero_type.key, hero_type) for hero_type in ordered)
+    hero_paths[new.key] = path
+    return old, new
+
+
+hero_paths: Dict[str, Path] = {}
+hero_cache.load()
 hero_types: Dict[str, HeroType] = _build_hero_types(Path(config.heroes_dir.get_string()))
+try:
+    hero_cache.save()
+except OSError:
+    traceback.print_exc()
@@ -1,5 +1,4 @@
 from filters.weapons import WeaponClassIter
-from listeners.tick import Delay, Repeat
 from mathlib import Vector
 
 
@@ -37,20 +36,28 @@ class Leap:
 class Meditation:
 
     def init(player, hero, skill):
-        skill._repeat = Repeat(Meditation._tick)
+        skill._repeat = None
 
     def _tick(player, skill):
         player.health = min(player.health + skill.current('heal'), player.max_health)
         if player.health == player.max_health:
-            skill._repeat.stop()
+            Meditation._stop(skill)
+
+    def _start(skill, player):
+        Meditation._stop(skill)
+        skill._repeat = skill.timers.repeat(skill.current('interval'), Meditation._tick, player, skill)
+
+    def _stop(skill):
+        if skill._repeat is not None:
+            skill._repeat.cancel()
+            skill._repeat = None
 
     def player_victim(skill, player, **rest):
-        skill._repeat.args = (player, skill)
-        skill._repeat.start(skill.current('interval'))
+        Meditation._start(skill, player)
 
     def skill_upgrade(skill, **rest):
-        skill._repeat.stop()
-        skill._repeat.start(skill.current('interval'))
+        if skill._repeat is not None:
+            Meditation._start(skill, skill._repeat.args[0])
 
     skill_downgrade = skill_upgrade
 
@@ -59,13 +66,14 @@ class TotalVanish:
 
     def init(player, hero, skill):
         skill._paralyze = None
+        skill._end_timer = None
 
     def player_ultimate(skill, player, **rest):
         if skill._paralyze is None:
             if skill.cooldown() <= 0:
                 player.color = player.color.with_alpha(0)
                 skill._paralyze = player.paralyze()
-                Delay(skill.current('duration'), TotalVanish._cancel, (skill, player))
+                skill._end_timer = skill.timers.delay(skill.current('duration'), TotalVanish._cancel, skill, player)
                 for weapon in player.weapons():
                     weapon.remove()
 
@@ -74,6 +82,7 @@ class TotalVanish:
 
     def _cancel(skill, player):
         if skill._paralyze is not None:
+            skill._end_timer.cancel()
             skill._paralyze.cancel()
             skill._paralyze = None
             player.color = player.color.with_alpha(255)
@@ -1,6 +1,5 @@
 from enum import Enum
 
-from listeners.tick import Delay
 from colors import Color, RED
 
 from herowars.utils import chance
@@ -67,7 +66,7 @@ class FinalCurse:
             player.health = 1
             godmode = player.godmode()
             player.color = Color(255, 150, 150)
-            Delay(skill.current('duration'), FinalCurse._end_curse, (player, attacker.index, skill, godmode))
+            skill.timers.delay(skill.current('duration'), FinalCurse._end_curse, player, attacker.index, skill, godmode)
 
             skill.effect('ring', center=player.stomach_location)
             player.display(
@@ -1,6 +1,5 @@
 from colors import Color
 from filters.players import PlayerIter
-from listeners.tick import Delay
 
 from herowars.utils import chance
 
@@ -50,7 +49,7 @@ class GodMode:
             skill.send_string(player, 'start_message', duration=duration)
             old_color = player.color
             player.color = Color(255, 255, 0)
-            Delay(duration, GodMode._end_ultimate, (skill, player, old_color))
+            skill.timers.delay(duration, GodMode._end_ultimate, skill, player, old_color)
 
     def _end_ultimate(skill, player, color):
         player.color = color
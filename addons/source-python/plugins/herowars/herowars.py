@@ -1,24 +1,33 @@
 # Python imports
 import functools
-from typing import Callable, Optional
+from typing import Any, Callable, Iterable, Optional, Set
 
 # Source-Python imports
 from commands import Command, CommandReturn
 from commands.client import ClientCommand
 from commands.say import SayCommand
+from commands.server import ServerCommand
 from cvars import ConVar
 from easyevents import event
-from messages.colors.saytext2 import GREEN, WHITE
+from listeners import OnLevelEnd, OnServerActivate
+from paths import PLUGIN_DATA_PATH
 from plugins.info import PluginInfo
 
 
 # Hero-Wars imports
 from . import config, database, menus, strings
-from .entities.hero import Hero
+from .chat_queue import chat_queue
+from .cooldowns import cooldown_scheduler
+from .entities import Hero, HeroType
 from .events import events
+from .hero_types import hero_types, on_hero_type_loaded, rebuild_hero_cache
+from .hot_reload import hero_watcher
 from .player import Player, UpgradeSkillsPopup
 from .players import player_dict
-from .utils import create_translation_string
+from .prefetch import prefetcher
+from .profile_cache import profile_cache
+from .profiler import profiler
+from .save_queue import save_queue
 
 
 plugin_info = PluginInfo(
@@ -34,25 +43,52 @@ ConVar('hw_version', plugin_info.version)
 # Messages and data management
 
 def unload():
+    hero_watcher.stop()
+    prefetcher.close()
+    save_queue.close()
+    database.save_players_data(player_dict.values())
+
+
+@OnServerActivate
+def _on_server_activate(edicts: Any, edict_count: int, max_clients: int):
+    # Models re-precache themselves on level init, so set them only after that
+    for hero_type in hero_types.values():
+        if hero_type.loaded:
+            hero_type.prepare_effects()
+
+
+@OnLevelEnd
+def _on_level_end():
     for player in player_dict.values():
-        database.save_player_data(player)
+        save_queue.put(database.snapshot_player_data(player), player.steamid)
+        profile_cache.store(player)
 
 
 @events.on('player_death', 'player_disconnect')
 def _save_player_data(player: Player, **eargs):
-    database.save_player_data(player)
+    save_queue.put(database.snapshot_player_data(player), player.steamid)
+
+
+@events.on('player_disconnect')
+def _on_player_disconnect(player: Player, **eargs):
+    player.clear_callbacks()
+    player.hero.cancel_timers()
+    chat_queue.discard(player.index)
+    cooldown_scheduler.discard(player.index)
+    profile_cache.store(player)
 
 
 @events.on('player_change_hero')
 def _on_player_change_hero(player: Player, new_hero: Hero, old_hero: Hero, **eargs):
-    database.save_hero_data(old_hero)
-    old_hero.skills.clear()
+    old_hero.cancel_timers()
+    save_queue.put(database.snapshot_hero_data(old_hero), player.steamid)
 
-    new_hero._create_skills()
+    if not new_hero.skills:
+        new_hero._create_skills()
     if new_hero._db_id is None:
         database.create_hero_data(new_hero, player.steamid)
     else:
-        database.load_skills_data(new_hero)
+        database.create_skill_data(new_hero)
     player.invoke_init_callbacks()
 
     if not player.dead:
@@ -61,23 +97,34 @@ def _on_player_change_hero(player: Player, new_hero: Hero, old_hero: Hero, **ear
     player.chat(strings.change_hero, hero_name=player.hero.name)
 
 
-@events.on(*config.xp_for_event.keys(), named=True)
-def _give_xp(event_name: str, player: Player, **eargs):
-    amount = config.xp_for_event[event_name].get_int()
-    old_level = player.hero.level
-    player.hero.xp += amount
-    if player.hero.level > old_level:
+def grant_xp(player: Player, amount: int, hero: Optional[Hero]=None) -> int:
+    """Give XP to a player's hero, the active one by default.
+
+    If the hero is the active one, fires a single `hero_level_up`
+    event for all the levels gained, with `level_delta` telling
+    how many there were, as its handlers act on the active hero.
+    Returns the number of levels gained.
+    """
+    if hero is None:
+        hero = player.hero
+    old_level = hero.level
+    level_delta = hero.grant_xp(amount)
+    if level_delta > 0 and hero is player.hero:
         events['hero_level_up'].fire(
             player=player,
-            hero=player.hero,
+            hero=hero,
             old_level=old_level,
-            new_level=player.hero.level,
+            new_level=hero.level,
+            level_delta=level_delta,
         )
-    player.chat(create_translation_string(
-        f'{GREEN}+{amount} {{xp_string}}{WHITE}: {{event_string}}',
-        xp_string=strings.common['XP'],
-        event_string=strings.messages[event_name],
-    ))
+    return level_delta
+
+
+@events.on(*config.xp_for_event.keys(), named=True)
+def _give_xp(event_name: str, player: Player, **eargs):
+    amount = config.xp_for_event[event_name].get_int()
+    grant_xp(player, amount)
+    player.chat(strings.xp_gained, amount=amount, event_str=strings.messages[event_name])
 
 
 @events.on('hero_level_up', 'player_spawn')
@@ -114,6 +161,7 @@ def _send_upgrade_skills_popup(event_name: str, player: Player, **eargs):
 def _cmd_resetskills(player_index: int):
     player = player_dict[player_index]
     player.hero.reset_skills()
+    player.compile_callbacks()
     player.chat(
         strings.unspent_skill_points,
         hero_name=player.hero.name,
@@ -141,6 +189,7 @@ _commands = (
     ('hw_upgradeskills', ('!us', '!upgradeskills'), menus.upgrade_skills.send),
     ('hw_resetskills', ('!rs', '!resetskills'), _cmd_resetskills),
     ('hw_heroinfo', ('!hi', '!heroinfo'), _cmd_heroinfo),
+    ('hw_top', ('!top',), menus.top_players.send),
 )
 
 def _run_command(callback: Callable[[int], None], command: Command, player_index: int, team_only: Optional[bool]=None):
@@ -154,6 +203,41 @@ for client_cmd, say_cmds, callback in _commands:
     _cmd = SayCommand(say_cmds)(_cmd)
 
 
+@ServerCommand('hw_profile')
+def _cmd_profile(command: Command):
+    """Profile events, callbacks, database calls, and menus.
+
+    Usage: hw_profile start|stop|dump [file]
+    Without a file, dump prints the report to the server console and logs.
+    Relative file paths are relative to the plugin's data directory.
+    """
+    action = command[1] if len(command) > 1 else ''
+    if action == 'start':
+        profiler.start()
+        print('[Hero-Wars] Profiling started')
+    elif action == 'stop':
+        profiler.stop()
+        print('[Hero-Wars] Profiling stopped')
+    elif action == 'dump':
+        report = profiler.report()
+        if len(command) > 2:
+            path = PLUGIN_DATA_PATH / 'herowars' / command[2]
+            path.parent.makedirs_p()
+            path.write_text(report, encoding='utf-8')
+            print(f'[Hero-Wars] Profile written to {path}')
+        else:
+            print(report)
+    else:
+        print('Usage: hw_profile start|stop|dump [file]')
+
+
+@ServerCommand('hw_rebuild_hero_cache')
+def _cmd_rebuild_hero_cache(command: Command):
+    """Re-parse all the hero definition files into the hero cache."""
+    rebuild_hero_cache()
+    print('[Hero-Wars] Hero cache rebuilt')
+
+
 @ClientCommand('+lookatweapon', '-lookatweapon')
 def inspect_to_ult(command: Command, player_index: int):
     """Use player ultimate when they inspect their weapon."""
@@ -168,9 +252,42 @@ def inspect_to_ult(command: Command, player_index: int):
         return CommandReturn.BLOCK
 
 
-# Invoke hero and skill callbacks for all existing events
+# Invoke hero and skill callbacks for the events loaded heroes listen to
 # This should stay at the bottom to ensure skills are being called last
 
-@events.on(*events, named=True)
 def _invoke_callbacks(event_name: str, player: Player, **eargs):
     player.invoke_callbacks(event_name, eargs)
+
+
+_subscribed_events: Set[str] = set()
+
+
+def subscribe_hero_events(types: Optional[Iterable[HeroType]]=None):
+    """Subscribe _invoke_callbacks to events the loaded heroes listen to.
+
+    Checks all the hero types by default.
+    Events no longer needed stay subscribed, as the players'
+    compiled callback tables ignore them with a single lookup.
+    """
+    if types is None:
+        types = hero_types.values()
+    needed = set()
+    for hero_type in types:
+        if not hero_type.loaded:
+            continue
+        needed.update(hero_type.event_callbacks)
+        for skill_type in hero_type.skill_types:
+            needed.update(skill_type.event_callbacks)
+    new_events = (needed & set(events)) - _subscribed_events
+    if new_events:
+        events.on(*new_events, named=True)(_invoke_callbacks)
+        _subscribed_events.update(new_events)
+
+
+@on_hero_type_loaded
+def _on_hero_type_loaded(hero_type: HeroType):
+    subscribe_hero_events([hero_type])
+    hero_type.prepare_effects()
+
+
+subscribe_hero_events()
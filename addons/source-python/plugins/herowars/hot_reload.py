@@ -0,0 +1,146 @@
+# Python imports
+import os
+import traceback
+from typing import Dict, Optional, Tuple
+
+# Source.Python imports
+from listeners.tick import Repeat
+from path import Path
+
+# Hero-Wars imports
+from . import config, database
+from .entities import Hero, HeroType, Skill
+from .hero_cache import hero_cache
+from .hero_types import reload_hero_type
+from .players import player_dict
+from .profile_cache import profile_cache
+from .save_queue import save_queue
+
+
+_HERO_FILES = ('data.yml', 'strings.yml', 'code.py')
+
+_Stamps = Tuple[Optional[Tuple[int, int]], ...]
+
+
+def _stamps(path: Path) -> _Stamps:
+    """Get the modification times and sizes of a hero's files."""
+    stamps = []
+    for name in _HERO_FILES:
+        try:
+            stat = os.stat(path / name)
+        except OSError:
+            stamps.append(None)
+        else:
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def _swap_skills(hero: Hero, hero_type: HeroType):
+    """Give a hero the skills of its new type, keeping the levels of existing ones."""
+    skills = {skill.key: skill for skill in hero.skills}
+    new_skills = []
+    for skill_type in hero_type.skill_types:
+        skill = skills.pop(skill_type.key, None)
+        if skill is None:
+            skill = Skill(skill_type)
+        else:
+            skill._type_object = skill_type
+            if skill.level > skill.max_level:
+                skill.level = skill.max_level
+        new_skills.append(skill)
+    for skill in skills.values():
+        skill.cancel_timers()
+    hero.skills[:] = new_skills
+
+
+def _swap_type(heroes: Dict[str, Hero], old: HeroType, new: HeroType) -> Optional[Hero]:
+    """Swap a hero's type object in place, returning the swapped hero if any."""
+    hero = heroes.get(old.key)
+    if hero is None or hero._type_object is not old:
+        return None
+    hero.cancel_timers()
+    hero._type_object = new
+    if old.key != new.key:
+        hero.mark_dirty('key')
+        items = [(new.key if key == old.key else key, value) for key, value in heroes.items()]
+        heroes.clear()
+        heroes.update(items)
+    if hero.skills:  # Otherwise they're created from the new type when first used
+        _swap_skills(hero, new)
+    return hero
+
+
+def _save_swapped(hero: Hero, steamid: str):
+    """Insert a swapped hero's new skills and queue its changes, e.g. a renamed key."""
+    if hero._db_id is None:
+        return
+    database.create_skill_data(hero)
+    save_queue.put(database.snapshot_hero_data(hero), steamid)
+
+
+def reload_hero(path: Path):
+    """Reload a hero from its files, keeping the players' heroes and levels.
+
+    Players using the hero get their init callbacks invoked again.
+    Cached profiles get theirs when the player reconnects.
+    Every swapped hero's renamed key and new skills are saved right away.
+    """
+    old, new = reload_hero_type(path)
+    try:
+        hero_cache.save()
+    except OSError:
+        traceback.print_exc()
+    if old is None:
+        print(f'[Hero-Wars] Loaded new hero {new.key}')
+        return
+
+    for player in player_dict.values():
+        hero = _swap_type(player.heroes, old, new)
+        if hero is not None:
+            _save_swapped(hero, player.steamid)
+            if hero is player.hero:
+                player.invoke_init_callbacks()
+    for steamid, profile in profile_cache.items():
+        hero = _swap_type(profile.heroes, old, new)
+        if hero is not None:
+            _save_swapped(hero, steamid)
+    print(f'[Hero-Wars] Reloaded hero {new.key}')
+
+
+class HeroWatcher:
+    """Poll the heroes' files and reload the heroes that change.
+
+    Only polls while `hw_hot_reload` is enabled.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._stamps: Optional[Dict[Path, _Stamps]] = None
+        self._repeat = Repeat(self.poll)
+
+    def start(self, interval: float):
+        self._repeat.start(interval)
+
+    def stop(self):
+        self._repeat.stop()
+
+    def poll(self):
+        if not config.hot_reload.get_bool():
+            self._stamps = None
+            return
+        stamps = {path: _stamps(path) for path in self.root.dirs()}
+        if self._stamps is None:  # Just enabled, nothing to compare to
+            self._stamps = stamps
+            return
+        for path, path_stamps in stamps.items():
+            if path_stamps == self._stamps.get(path) or path_stamps[0] is None:
+                continue
+            try:
+                reload_hero(path)
+            except Exception:
+                traceback.print_exc()
+        self._stamps = stamps
+
+
+hero_watcher = HeroWatcher(Path(config.heroes_dir.get_string()))
+hero_watcher.start(config.hot_reload_interval.get_float())
@@ -0,0 +1,41 @@
+# Python imports
+import functools
+import math
+from typing import List
+
+# Hero-Wars imports
+from . import config, database
+from .backends import LeaderboardRow
+from .cooldowns import clock
+from .prefetch import prefetcher
+
+
+class Leaderboard:
+    """Top players cached in memory and refreshed in the background.
+
+    Menus are built from the cached rows, so paging through them
+    never waits for the database. Stale rows are shown until
+    the refreshed ones have been fetched.
+    """
+
+    def __init__(self):
+        self._rows: List[LeaderboardRow] = []
+        self._refreshed_at = -math.inf
+
+    def rows(self) -> List[LeaderboardRow]:
+        """Get the cached rows, refreshing them if they're older than `hw_leaderboard_ttl`."""
+        if clock.now - self._refreshed_at >= config.leaderboard_ttl.get_float():
+            self.refresh()
+        return self._rows
+
+    def refresh(self):
+        """Fetch the rows again on the prefetch thread."""
+        self._refreshed_at = clock.now
+        prefetcher.submit(functools.partial(self._fetch, config.leaderboard_size.get_int()))
+
+    def _fetch(self, limit: int):
+        self._rows = database.fetch_leaderboard(limit=limit)
+
+
+leaderboard = Leaderboard()
+leaderboard.refresh()
@@ -10,9 +10,11 @@ from . import strings
 from .entities import Hero
 from .events import events
 from .hero_types import hero_types
+from .leaderboard import leaderboard
 from .player import Player, UpgradeSkillsPopup
 from .players import player_dict
-from .utils import create_translation_string, split_translation_string
+from .profiler import profiler
+from .utils import create_translation_string
 
 
 BuildCallback = Callable[[Menu, Player], None]
@@ -32,6 +34,7 @@ def _menu(
 
 
 def _build(callback: BuildCallback) -> Callable[[Menu, int], None]:
+    @profiler.timed('menu', callback.__name__)
     def build_callback(menu, player_index):
         menu.clear()
         return callback(menu, player_dict[player_index])
@@ -53,12 +56,14 @@ def _main_build(menu: Menu, player: Player):
         Option(strings.menus['Upgrade Skills'], upgrade_skills),
         Option(strings.menus['Reset Skills'], 'RESET'),
         Option(strings.menus['Player Settings'], player_settings),
+        Option(strings.menus['Top Players'], top_players),
     ])
 
 
 def _main_select(menu: Menu, player: Player, choice: Any) -> Menu:
     if choice.value == 'RESET':
         player.hero.reset_skills()
+        player.compile_callbacks()
         player.info(create_translation_string(
             f'{{unspent_message}}: {ORANGE}{player.hero.skill_points}',
             unspent_message=strings.messages['Unspent Skill Points'],
@@ -114,7 +119,7 @@ def _change_hero_select(menu: Menu, player: Player, choice: Any):
         return
     old_hero = player.hero
     if choice.value not in player.heroes:
-        player.heroes[choice.value] = Hero(hero_types[choice.value])
+        player.add_hero(Hero(hero_types[choice.value]))
     player.hero = player.heroes[choice.value]
     events['player_change_hero'].fire(
         player=player,
@@ -126,6 +131,7 @@ def _change_hero_select(menu: Menu, player: Player, choice: Any):
 def _view_skills_build(menu: Menu, player: Player):
     if menu.hero_type is None:
         menu.hero_type = player.hero._type_object
+    menu.hero_type.materialize()
     menu.description = menu.hero_type.name
     page = 0
     option_count = 0
@@ -133,7 +139,7 @@ def _view_skills_build(menu: Menu, player: Player):
     for skill in menu.hero_type.skill_types:
         description = [
             Text(create_translation_string('  {row}', row=row))
-            for row in split_translation_string(skill.description)
+            for row in skill.description_rows
         ]
         if option_count + 1 + len(description) > menu._get_max_item_count():
             menu.extend([Text(' ') for _ in range(menu._get_max_item_count() - option_count)])
@@ -187,6 +193,7 @@ def _upgrade_skills_select(menu: Menu, player: Player, choice: Any):
         if skill.key == choice.value:
             if player.hero.can_upgrade_skill(skill):
                 skill.level += 1
+                player.compile_callbacks()
                 player.info(create_translation_string(
                     '{skill_name} {upgraded_str}',
                     skill_name=skill.name,
@@ -223,6 +230,17 @@ def _player_settings_select(menu: Menu, player: Player, choice: Any):
     return menu
 
 
+def _top_players_build(menu: Menu, player: Player):
+    for rank, row in enumerate(leaderboard.rows(), start=1):
+        menu.append(Text(create_translation_string(
+            '{rank}. {name} ({total_level_str}: {total_level})',
+            rank=rank,
+            name=row.name or row.steamid,
+            total_level_str=strings.common['Total Level'],
+            total_level=row.total_level,
+        )))
+
+
 main = _menu('Hero-Wars', _main_build, _main_select)
 view_heroes = _menu(strings.menus['View Heroes'], _view_heroes_build, _view_heroes_select)
 change_hero = _menu(strings.menus['Change Hero'], _change_hero_build, _change_hero_select)
@@ -230,3 +248,4 @@ view_skills = _menu(strings.menus['View Skills'], _view_skills_build)
 view_skills.hero_type = None
 upgrade_skills = _menu(strings.menus['Upgrade Skills'], _upgrade_skills_build, _upgrade_skills_select)
 player_settings = _menu(strings.menus['Player Settings'], _player_settings_build, _player_settings_select)
+top_players = _menu(strings.menus['Top Players'], _top_players_build)
@@ -1,18 +1,22 @@
 # Python imports
-from collections import OrderedDict
+import time
+from collections import defaultdict, OrderedDict
 from enum import Enum
 from functools import partialmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 # Source.Python imports
-from messages import HintText, HudMsg, SayText2, TextMsg
+from messages import HintText, HudMsg, TextMsg
+from translations.strings import TranslationStrings
 
 # Custom package imports
 from dataclasses import dataclass
 from easyplayer import EasyPlayer
 
 # Hero-Wars imports
-from .entities import Hero
+from .chat_queue import chat_queue
+from .entities import EventCallback, Hero, Skill
+from .profiler import profiler
 
 
 class UpgradeSkillsPopup(Enum):
@@ -25,7 +29,11 @@ class UpgradeSkillsPopup(Enum):
 class PlayerSettings:
     """Store player's settings in a separate object for clarity."""
     inspect_to_ult: bool = True
-    upgrade_skills_popup: UpgradeSkillsPopup = 1
+    upgrade_skills_popup: UpgradeSkillsPopup = UpgradeSkillsPopup.ON_DEATH
+
+
+# Indexes of the players with compiled callbacks for each event
+callback_listeners: Dict[str, Set[int]] = defaultdict(set)
 
 
 class Player(EasyPlayer):
@@ -36,6 +44,9 @@ class Player(EasyPlayer):
         self.heroes: OrderedDict[str, Hero] = OrderedDict()
         self._hero: Hero = None
         self.settings: PlayerSettings = PlayerSettings()
+        self._saved_row: Dict[str, Any] = {}  # Player's columns as of the last save
+        self._total_level = 0
+        self._callbacks: Dict[str, List[Tuple[Optional[Skill], EventCallback]]] = {}
 
     @property
     def hero(self) -> Hero:
@@ -47,32 +58,87 @@ class Player(EasyPlayer):
             raise ValueError(f'Hero {value.name} not owned by player {self.name}')
         self._hero = value
 
+    def add_hero(self, hero: Hero):
+        """Give a hero to the player."""
+        self.heroes[hero.key] = hero
+        hero._owner = self
+        self._total_level += hero.level
+
     def total_level(self) -> int:
-        """Get the total sum of all player's heroes."""
-        return sum(hero.level for hero in self.heroes.values())
+        """Get the total sum of all player's heroes.
+
+        Kept up to date by the heroes as their levels change.
+        """
+        return self._total_level
 
     def _message(self, type_: type, message: str, message_kwargs={}, **tokens: Dict[str, Any]):
         """Send a message of type to the player."""
         type_(message, **message_kwargs).send(self.index, **tokens)
 
     def invoke_init_callbacks(self):
-        """Invoke init callbacks for the current hero and its skills."""
+        """Invoke init callbacks for the current hero and its skills.
+
+        Also compiles the event callbacks for the new hero.
+        """
         if self.hero._type_object.init_callback is not None:
             self.hero._type_object.init_callback(self, self.hero)
         for skill in self.hero.skills:
             if skill._type_object.init_callback is not None:
                 skill._type_object.init_callback(self, self.hero, skill)
+        self.compile_callbacks()
+
+    def compile_callbacks(self):
+        """Compile the table of callbacks each event should invoke.
+
+        Must be called whenever the set of invokable callbacks changes,
+        i.e. when the hero changes or a skill's level changes.
+        """
+        callbacks = {}
+        for event_name, callback in self.hero.event_callbacks.items():
+            callbacks.setdefault(event_name, []).append((None, callback))
+        for skill in self.hero.skills:
+            if skill.level > 0 or skill.passive:
+                for event_name, callback in skill.event_callbacks.items():
+                    callbacks.setdefault(event_name, []).append((skill, callback))
+        self._set_callbacks(callbacks)
+
+    def clear_callbacks(self):
+        """Stop invoking any callbacks, e.g. when the player leaves."""
+        self._set_callbacks({})
+
+    def _set_callbacks(self, callbacks: Dict[str, List[Tuple[Optional[Skill], EventCallback]]]):
+        for event_name in self._callbacks.keys() - callbacks.keys():
+            callback_listeners[event_name].discard(self.index)
+        for event_name in callbacks.keys():
+            callback_listeners[event_name].add(self.index)
+        self._callbacks = callbacks
 
     def invoke_callbacks(self, event_name: str, eargs: Dict[str, Any]):
         """Invoke event callbacks for the current hero and its skills."""
-        eargs = eargs.copy()  # Avoid accidentally modifying source dict
-        eargs.update({'player': self, 'hero': self.hero})
-        self.hero.invoke_callback(event_name, eargs)
-        for skill in self.hero.skills:
-            eargs['skill'] = skill
-            skill.invoke_callback(event_name, eargs)
+        callbacks = self._callbacks.get(event_name)
+        if callbacks is None:
+            return
+        if profiler.enabled:
+            return self._invoke_callbacks_profiled(event_name, eargs, callbacks)
+        hero = self.hero
+        for skill, callback in callbacks:
+            callback.invoke(self, hero, skill, eargs)
+
+    def _invoke_callbacks_profiled(self, event_name: str, eargs: Dict[str, Any], callbacks: List[Tuple[Optional[Skill], EventCallback]]):
+        """Invoke event callbacks while recording their latencies."""
+        event_start = time.perf_counter()
+        hero = self.hero
+        for skill, callback in callbacks:
+            start = time.perf_counter()
+            callback.invoke(self, hero, skill, eargs)
+            key = skill.key if skill is not None else self.hero.key
+            profiler.record('callback', f'{key}.{event_name}', time.perf_counter() - start)
+        profiler.record('event', event_name, time.perf_counter() - event_start)
+
+    def chat(self, message: TranslationStrings, **tokens: Dict[str, Any]):
+        """Queue a chat message to be sent at the end of the tick."""
+        chat_queue.put(self.index, message, **tokens)
 
-    chat = partialmethod(_message, SayText2)
     info = partialmethod(_message, HintText)
     warn = partialmethod(_message, TextMsg)
     display = partialmethod(_message, HudMsg)
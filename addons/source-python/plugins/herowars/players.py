@@ -9,6 +9,9 @@ from . import config, database, strings
 from .entities import Hero, HeroType
 from .hero_types import hero_types
 from .player import Player
+from .prefetch import prefetcher
+from .profile_cache import profile_cache
+from .save_queue import save_queue
 from .utils import first
 
 
@@ -26,7 +29,20 @@ def init_player(player_index: int) -> Player:
     Intended to be used automatically by a PlayerDictionary.
     """
     player = Player(player_index)
-    exists = database.load_player_data(player)
+    rows = prefetcher.pop(player.steamid)
+
+    # Recently seen players are restored from memory
+    profile = profile_cache.pop(player.steamid)
+    if profile is not None:
+        profile.apply(player)
+        player.invoke_init_callbacks()
+        return player
+
+    if rows is None:  # Prefetch hasn't finished, load synchronously
+        if save_queue.pending_for(player.steamid):
+            save_queue.flush()  # Don't load stale data over a pending save
+        rows = database.fetch_player_data(player.steamid)
+    exists = database.apply_player_data(player, rows)
     if not player.hero:
 
         # Prior data might still exist, just particular hero has been deleted
@@ -36,20 +52,25 @@ def init_player(player_index: int) -> Player:
         # Give one hero by default
         else:
             hero = Hero(get_starting_hero_type())
-            player.heroes[hero.key] = hero
+            player.add_hero(hero)
             player.hero = hero
 
-    # Create player hero's skills
-    player.hero._create_skills()
-    if exists:
-        database.load_skills_data(player.hero)
+    # Create skills for a freshly given or fallback hero
+    if not player.hero.skills:
+        player.hero._create_skills()
 
-    else:
+    if not exists:
         # Pre-emptively insert into database to allow update operations 
         # in the future, without having to query for existance every time
         database.create_player_data(player)
         player.chat(strings.welcome)
 
+    elif player.hero._db_id is None:
+        database.create_hero_data(player.hero, player.steamid)
+
+    else:  # Skills added to the hero since it was saved
+        database.create_skill_data(player.hero)
+
     # Call init_callbacks for heroes and skills
     player.invoke_init_callbacks()
     return player
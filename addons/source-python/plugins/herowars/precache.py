@@ -7,4 +7,7 @@ _models = {}
 
 def get_model(name: str) -> Model:
     """Get a model for a name."""
-    return _models.setdefault(name, Model(name))
+    model = _models.get(name)
+    if model is None:
+        model = _models[name] = Model(name)
+    return model
@@ -0,0 +1,104 @@
+# Python imports
+import queue
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Source.Python imports
+from listeners import OnClientDisconnect, OnNetworkidValidated
+from players.helpers import playerinfo_from_index
+from threads import GameThread
+
+# Hero-Wars imports
+from . import database
+from .profile_cache import profile_cache
+from .save_queue import save_queue
+
+
+class Prefetcher:
+    """Fetch player data on a background thread ahead of time.
+
+    Data is requested as soon as a client's SteamID is known,
+    and picked up later when the player is first initialized.
+    Other reads can be submitted to run on the same thread.
+    """
+
+    def __init__(self, fetch: Callable[[str], List[Any]]):
+        self._fetch = fetch
+        self._requests = queue.Queue()
+        self._requested: Set[str] = set()
+        self._results: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._thread = GameThread(target=self._run, name='herowars-prefetch', daemon=True)
+        self._thread.start()
+
+    def request(self, steamid: str):
+        """Start fetching a player's data in the background."""
+        with self._lock:
+            if steamid in self._requested:
+                return
+            self._requested.add(steamid)
+        self._requests.put(steamid)
+
+    def submit(self, task: Callable[[], None]):
+        """Run any other database task on the background thread."""
+        self._requests.put(task)
+
+    def pop(self, steamid: str) -> Optional[List[Any]]:
+        """Take a player's fetched data, if it's ready.
+
+        Returns None if the data isn't available yet,
+        in which case any later result will be discarded.
+        """
+        with self._lock:
+            self._requested.discard(steamid)
+            return self._results.pop(steamid, None)
+
+    def discard(self, steamid: str):
+        """Forget a player's request and any fetched data."""
+        self.pop(steamid)
+
+    def close(self):
+        """Stop the background thread."""
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            steamid = self._requests.get()
+            if steamid is None:
+                return
+            if callable(steamid):  # Submitted task
+                try:
+                    steamid()
+                except Exception:
+                    traceback.print_exc()
+                continue
+            with self._lock:
+                if steamid not in self._requested:
+                    continue
+            try:
+                if save_queue.pending_for(steamid):
+                    save_queue.flush()  # Don't fetch stale data over a pending save
+                rows = self._fetch(steamid)
+            except Exception:
+                traceback.print_exc()
+                continue
+            with self._lock:
+                if steamid in self._requested:
+                    self._results[steamid] = rows
+
+
+prefetcher = Prefetcher(database.fetch_player_data)
+
+
+@OnNetworkidValidated
+def _on_networkid_validated(name: str, networkid: str):
+    if networkid not in profile_cache:
+        prefetcher.request(networkid)
+
+
+@OnClientDisconnect
+def _on_client_disconnect(index: int):
+    # Clients can leave before their player is initialized
+    prefetcher.discard(playerinfo_from_index(index).steamid)
@@ -0,0 +1,104 @@
+# Python imports
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Site-Package imports
+from dataclasses import dataclass
+
+# Hero-Wars imports
+from . import config
+from .entities import Hero
+from .player import Player, PlayerSettings
+
+
+@dataclass
+class Profile:
+    """Loaded state of a player who has left the server."""
+    settings: PlayerSettings
+    heroes: 'OrderedDict[str, Hero]'
+    hero: Hero
+    saved_row: Dict[str, Any]
+    size: int = 0
+
+    @classmethod
+    def from_player(cls, player: Player) -> 'Profile':
+        profile = cls(player.settings, player.heroes, player.hero, player._saved_row)
+        profile.size = _estimate_size(profile)
+        return profile
+
+    def apply(self, player: Player):
+        """Give the cached state to a new player object."""
+        player.settings = self.settings
+        for hero in self.heroes.values():
+            player.add_hero(hero)
+        player.hero = self.hero
+        player._saved_row = self.saved_row
+
+
+def _estimate_size(profile: Profile) -> int:
+    """Roughly estimate the memory used by a profile, in bytes."""
+    size = sys.getsizeof(profile.settings) + sys.getsizeof(profile.heroes)
+    for hero in profile.heroes.values():
+        size += sys.getsizeof(hero) + sys.getsizeof(vars(hero))
+        for skill in hero.skills:
+            size += sys.getsizeof(skill) + sys.getsizeof(vars(skill))
+    return size
+
+
+class ProfileCache:
+    """LRU cache of recently seen players' profiles, keyed by SteamID.
+
+    Profiles hold the same hero and skill objects the player used,
+    and are only stored after their changes have been queued for saving,
+    so a cached profile is never older than the database.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._profiles: 'OrderedDict[str, Profile]' = OrderedDict()
+        self._size = 0
+
+    def __contains__(self, steamid: str) -> bool:
+        return steamid in self._profiles
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def items(self) -> Iterator[Tuple[str, Profile]]:
+        """Iterate over the cached profiles and their SteamIDs."""
+        return iter(self._profiles.items())
+
+    def store(self, player: Player):
+        """Store a player's profile, evicting the oldest ones if needed."""
+        self.discard(player.steamid)
+        profile = Profile.from_player(player)
+        self._profiles[player.steamid] = profile
+        self._size += profile.size
+        while self._profiles and (
+            len(self._profiles) > self.max_entries
+            or self._size > self.max_bytes
+        ):
+            _, evicted = self._profiles.popitem(last=False)
+            self._size -= evicted.size
+
+    def pop(self, steamid: str) -> Optional[Profile]:
+        """Remove and return a player's profile, if cached."""
+        profile = self._profiles.pop(steamid, None)
+        if profile is not None:
+            self._size -= profile.size
+        return profile
+
+    def discard(self, steamid: str):
+        self.pop(steamid)
+
+    def clear(self):
+        self._profiles.clear()
+        self._size = 0
+
+
+profile_cache = ProfileCache(
+    max_entries=config.profile_cache_size.get_int(),
+    max_bytes=config.profile_cache_memory.get_int() * 1024,
+)
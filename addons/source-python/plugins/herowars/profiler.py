@@ -0,0 +1,108 @@
+# Python imports
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class _Stats:
+    """Call count and latency histogram of a profiled section."""
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Bucket i counts calls that took under 2**i microseconds
+        self.buckets: List[int] = [0] * 32
+
+    def add(self, elapsed: float):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        bucket = min(int(elapsed * 1_000_000).bit_length(), len(self.buckets) - 1)
+        self.buckets[bucket] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Get an upper bound for a percentile's latency, in seconds."""
+        threshold = self.calls * fraction
+        count = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            count += bucket_count
+            if count >= threshold:
+                return 2 ** bucket / 1_000_000
+        return self.max
+
+
+class Profiler:
+    """Record call counts and latencies of named code sections.
+
+    Sections are identified by a category (e.g. 'event' or 'database')
+    and a key (e.g. the event name or the skill key).
+    Callers should check `enabled` before timing anything,
+    so that profiling costs next to nothing when it's off.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at: Optional[float] = None
+        self._stats: Dict[Tuple[str, str], _Stats] = {}
+        self._lock = threading.Lock()  # Database sections run on other threads
+
+    def start(self):
+        """Clear any previous results and start profiling."""
+        with self._lock:
+            self._stats.clear()
+        self.started_at = time.time()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def record(self, category: str, key: str, elapsed: float):
+        """Record one call of a section that took `elapsed` seconds."""
+        with self._lock:
+            stats = self._stats.get((category, key))
+            if stats is None:
+                stats = self._stats[category, key] = _Stats()
+            stats.add(elapsed)
+
+    def timed(self, category: str, key: Optional[str]=None) -> Callable:
+        """Decorate a function to be profiled when the profiler is enabled.
+
+        The key defaults to the function's name.
+        """
+        def decorator(func: Callable) -> Callable:
+            section_key = key if key is not None else func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(category, section_key, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def report(self) -> str:
+        """Format the results as a table sorted by total time spent."""
+        with self._lock:
+            stats = sorted(self._stats.items(), key=lambda item: item[1].total, reverse=True)
+        duration = time.time() - self.started_at if self.started_at is not None else 0
+        lines = [
+            f'Hero-Wars profile, {duration:.1f} seconds',
+            f'{"category":<10} {"key":<40} {"calls":>8} {"total ms":>10} {"mean us":>9} {"p50 us":>9} {"p99 us":>9} {"max us":>9}',
+        ]
+        for (category, key), section in stats:
+            lines.append(
+                f'{category:<10} {key:<40} {section.calls:>8} '
+                f'{section.total * 1000:>10.2f} {section.total / section.calls * 1_000_000:>9.1f} '
+                f'{section.percentile(0.5) * 1_000_000:>9.0f} {section.percentile(0.99) * 1_000_000:>9.0f} '
+                f'{section.max * 1_000_000:>9.1f}'
+            )
+        return '\n'.join(lines)
+
+
+profiler = Profiler()
@@ -0,0 +1,176 @@
+# Python imports
+import itertools
+import threading
+import traceback
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+# Source.Python imports
+from threads import GameThread
+
+# Hero-Wars imports
+from . import config, database
+from .backends import Records
+
+
+class SaveQueue:
+    """Write-behind queue for database records.
+
+    Records are written by a background thread in batches,
+    so the game thread never has to wait on the database.
+    Repeated records for the same row are merged together,
+    and only the latest values of each row are written.
+
+    The queue is bounded: putting new rows into a full queue
+    blocks until the writer thread has caught up.
+
+    Batches that fail to write are merged back into the queue
+    and retried, since their entities were already marked clean.
+    """
+
+    def __init__(self, writer: Callable[[Records], None], max_size: int=1024, batch_size: int=256, retry_delay: float=1.0):
+        self._writer = writer
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._pending: Records = OrderedDict()
+        self._in_flight: Set[Tuple[str, Any]] = set()
+        self._owners: Dict[Tuple[str, Any], str] = {}  # SteamIDs of the players the rows belong to
+        self._failures = 0
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = GameThread(target=self._run, name='herowars-save-queue', daemon=True)
+        self._thread.start()
+
+    def __contains__(self, key: Tuple[str, Any]) -> bool:
+        """Check if a row is waiting to be written or being written."""
+        with self._condition:
+            return key in self._pending or key in self._in_flight
+
+    def pending_for(self, steamid: str) -> bool:
+        """Check if any of a player's rows are waiting to be written or being written."""
+        with self._condition:
+            return any(
+                self._owners.get(key) == steamid
+                for key in itertools.chain(self._pending, self._in_flight)
+            )
+
+    def put(self, records: Records, steamid: Optional[str]=None):
+        """Queue records to be written in the background.
+
+        The records can be tagged with the SteamID of the player they belong to.
+        """
+        with self._condition:
+            for key, values in records.items():
+                while (
+                    key not in self._pending
+                    and len(self._pending) >= self.max_size
+                    and self._running
+                ):
+                    self._condition.wait()
+                if key in self._pending:
+                    self._pending[key].update(values)
+                else:
+                    self._pending[key] = dict(values)
+                if steamid is not None:
+                    self._owners[key] = steamid
+            self._condition.notify_all()
+
+    def flush(self):
+        """Block until all the queued records have been written.
+
+        Gives up if a write fails, leaving the failed records queued.
+        """
+        with self._condition:
+            failures = self._failures
+            self._condition.notify_all()
+            while (
+                (self._pending or self._in_flight)
+                and self._thread.is_alive()
+                and self._failures == failures
+            ):
+                self._condition.wait()
+            if self._pending and not self._thread.is_alive():  # Write synchronously
+                self._write(self._take_batch(len(self._pending)))
+
+    def close(self):
+        """Flush the queue and stop the writer thread."""
+        self.flush()
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        if self._pending:
+            print(f'[Hero-Wars] {len(self._pending)} rows could not be saved')
+
+    def _take_batch(self, size: int) -> Records:
+        batch = OrderedDict()
+        while self._pending and len(batch) < size:
+            key, values = self._pending.popitem(last=False)
+            batch[key] = values
+        return batch
+
+    def _write(self, batch: Records) -> bool:
+        """Write a batch, merging it back into the queue if it fails.
+
+        Must be called with the condition held.
+        """
+        try:
+            self._writer(batch)
+            self._forget_owners(batch)
+            return True
+        except Exception:
+            traceback.print_exc()
+            self._requeue(batch)
+            return False
+
+    def _requeue(self, batch: Records):
+        """Put a failed batch back to the front of the queue.
+
+        Values queued after the batch was taken are newer, so they win.
+        """
+        for key, values in reversed(batch.items()):
+            if key in self._pending:
+                values.update(self._pending[key])
+            self._pending[key] = values
+            self._pending.move_to_end(key, last=False)
+        self._failures += 1
+
+    def _forget_owners(self, batch: Records):
+        for key in batch:
+            if key not in self._pending and key not in self._in_flight:
+                self._owners.pop(key, None)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                batch = self._take_batch(self.batch_size)
+                self._in_flight.update(batch)
+                self._condition.notify_all()  # Wake up blocked put() calls
+            written = False
+            try:
+                self._writer(batch)
+                written = True
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self._condition:
+                    self._in_flight.difference_update(batch)
+                    if written:
+                        self._forget_owners(batch)
+                    else:
+                        self._requeue(batch)
+                    self._condition.notify_all()
+                    if not written and self._running:
+                        self._condition.wait(self.retry_delay)
+
+
+save_queue = SaveQueue(
+    database.write_snapshot,
+    max_size=config.db_save_queue_size.get_int(),
+    batch_size=config.db_save_batch_size.get_int(),
+)
@@ -27,6 +27,11 @@ change_hero = create_translation_string(
     change_hero_str=messages['Change Hero'],
 )
 
+xp_gained = create_translation_string(
+    f"{GREEN}+{{amount}} {{xp_str}}{WHITE}: {{event_str}}",
+    xp_str=common['XP'],
+)
+
 unspent_skill_points = create_translation_string(
     f"{GREEN}{{hero_name}} {WHITE}- {{unspent_skill_points_str}}: {ORANGE}{{skill_points}}",
     unspent_skill_points_str=messages['Unspent Skill Points'],
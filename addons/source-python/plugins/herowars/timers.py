@@ -0,0 +1,174 @@
+# Python imports
+import math
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Source.Python imports
+from listeners import OnLevelEnd, OnTick
+
+# Hero-Wars imports
+from .cooldowns import clock
+
+
+class Timer:
+    """Callback scheduled to run after a delay, optionally repeating."""
+
+    __slots__ = ('callback', 'args', 'kwargs', 'interval', 'deadline', 'running', '_rounds', '_group')
+
+    def __init__(
+        self,
+        callback: Callable,
+        args: Tuple,
+        kwargs: Dict[str, Any],
+        deadline: float,
+        interval: Optional[float]=None,
+    ):
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.interval = interval
+        self.running = True
+        self._rounds = 0
+        self._group: Optional['TimerGroup'] = None
+
+    def cancel(self):
+        """Stop the timer from running (again)."""
+        if self.running:
+            self.running = False
+            if self._group is not None:
+                self._group._timers.discard(self)
+
+    def finish(self):
+        """Cancel the timer, running a pending delay's callback right away.
+
+        Delays usually end something their owner started, e.g. a skill's
+        effect, so they're finished rather than dropped when cancelled
+        in bulk. Repeats are simply cancelled.
+        """
+        if not self.running:
+            return
+        self.cancel()
+        if self.interval is None:
+            self._run()
+
+    def _run(self):
+        try:
+            self.callback(*self.args, **self.kwargs)
+        except Exception:
+            traceback.print_exc()
+
+
+class TimerWheel:
+    """Hashed timer wheel advanced by the server tick.
+
+    Timers are hashed into one of `slot_count` slots by their deadline,
+    so scheduling and cancelling a timer are constant time operations,
+    and each tick only has to look at the timers in the current slot.
+    Timers further away than one turn of the wheel wait for extra rounds.
+    """
+
+    def __init__(self, resolution: float=0.05, slot_count: int=512):
+        self.resolution = resolution
+        self._slots: List[List[Timer]] = [[] for _ in range(slot_count)]
+        self._position = 0
+        self._time = clock.now
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Get the number of scheduled timers, including cancelled ones."""
+        return self._count
+
+    def schedule(self, timer: Timer):
+        ticks = max(math.ceil((timer.deadline - self._time) / self.resolution), 1)
+        slot_count = len(self._slots)
+        timer._rounds = (ticks - 1) // slot_count
+        self._slots[(self._position + ticks) % slot_count].append(timer)
+        self._count += 1
+
+    def advance(self, now: float):
+        """Run all the timers due by `now`."""
+        if not self._count:
+            self._time = now
+            return
+        while self._time + self.resolution <= now:
+            self._time += self.resolution
+            self._position = (self._position + 1) % len(self._slots)
+            self._run_slot(self._position)
+
+    def clear(self):
+        """Cancel all the scheduled timers without running them.
+
+        Used at level end, when the players and queues the callbacks
+        would touch are being torn down anyway.
+        """
+        for slot in self._slots:
+            for timer in slot:
+                timer.cancel()
+            slot.clear()
+        self._count = 0
+
+    def _run_slot(self, position: int):
+        timers, self._slots[position] = self._slots[position], []
+        waiting = []
+        for timer in timers:
+            if not timer.running:
+                self._count -= 1
+            elif timer._rounds > 0:
+                timer._rounds -= 1
+                waiting.append(timer)
+            else:
+                self._count -= 1
+                self._fire(timer)
+        self._slots[position].extend(waiting)
+
+    def _fire(self, timer: Timer):
+        if timer.interval is None:
+            timer.cancel()
+        else:
+            timer.deadline += timer.interval
+            self.schedule(timer)
+        timer._run()
+
+
+timer_wheel = TimerWheel()
+
+
+class TimerGroup:
+    """Timers owned by one object, e.g. a skill, cancelled together."""
+
+    def __init__(self, wheel: TimerWheel=timer_wheel):
+        self._wheel = wheel
+        self._timers: Set[Timer] = set()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def delay(self, delay: float, callback: Callable, *args: Tuple, **kwargs: Dict[str, Any]) -> Timer:
+        """Call a function once after `delay` seconds."""
+        return self._add(Timer(callback, args, kwargs, clock.now + delay))
+
+    def repeat(self, interval: float, callback: Callable, *args: Tuple, **kwargs: Dict[str, Any]) -> Timer:
+        """Call a function every `interval` seconds until cancelled."""
+        return self._add(Timer(callback, args, kwargs, clock.now + interval, interval))
+
+    def cancel_all(self):
+        """Finish all the timers in the group, see `Timer.finish()`."""
+        for timer in list(self._timers):
+            timer.finish()
+
+    def _add(self, timer: Timer) -> Timer:
+        timer._group = self
+        self._timers.add(timer)
+        self._wheel.schedule(timer)
+        return timer
+
+
+@OnTick
+def _on_tick():
+    timer_wheel.advance(clock.now)
+
+
+@OnLevelEnd
+def _on_level_end():
+    timer_wheel.clear()
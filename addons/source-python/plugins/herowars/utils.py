@@ -1,7 +1,5 @@
 # Python imports
-import math
 import random
-import time
 from typing import Any, Dict, Iterable, List, Optional, Tuple, TypeVar
 
 # Source.Python imports
@@ -76,34 +74,3 @@ def split_translation_string(translation_string: TranslationStrings, separator:
 def chance(percentage: int) -> bool:
     """Compare a random chance to the given percentage."""
     return random.random() * 100 < percentage
-
-
-class Cooldown:
-    """A cooldown whose value lowers with time."""
-
-    def __init__(self, value: float=0.0):
-        self._value = value + time.time()
-        self._reserved = False
-
-    @property
-    def remaining(self) -> float:
-        if self._reserved:
-            return math.inf
-        return max(self._value - time.time(), 0)
-
-    @remaining.setter
-    def remaining(self, value: float):
-        self._value = value + time.time()
-
-    def reserve(self):
-        """Flag the cooldown as 'reserved'.
-
-        The cooldown will be flagged as if it were already on-cooldown,
-        without actually starting the cooldown.
-        """
-        self._reserved = True
-
-    def start(self, duration: float):
-        """Start the cooldown."""
-        self._reserved = False
-        self.remaining = duration